@@ -2,11 +2,9 @@ import streamlit as st
 import os
 from datetime import datetime
 import time
-from core.auth import AuthManager
-from core.bedrock_client import BedrockClient
-from core.conversation import ConversationManager
-from core.guardrails import COPPAGuardrails
-from core.constants import DEMO_USERS 
+from core.services import get_services, STARTUP_SERVICES
+from core.metrics import start_metrics_export
+from core.constants import DEMO_USERS, DEMO_DELAYS_ENABLED
 
 st.set_page_config(
     page_title="JurneeGo - Safe AI Learning Assistant",
@@ -30,14 +28,14 @@ except Exception as e:
     print(f"Warning: Could not load Streamlit secrets: {e}")
 
     
-if 'auth_manager' not in st.session_state:
-    st.session_state.auth_manager = AuthManager()
-if 'bedrock_client' not in st.session_state:
-    st.session_state.bedrock_client = BedrockClient()
-if 'conversation_manager' not in st.session_state:
-    st.session_state.conversation_manager = ConversationManager()
-if 'guardrails' not in st.session_state:
-    st.session_state.guardrails = COPPAGuardrails()
+# Prometheus endpoint/file when METRICS_PORT or METRICS_FILE is set (started once per process)
+start_metrics_export()
+
+# Services are created once per process and shared; sessions only hold references
+services = get_services()
+for service_name in STARTUP_SERVICES:
+    if service_name not in st.session_state:
+        st.session_state[service_name] = services.get(service_name)
 
 # Custom CSS made by a non designer clearly
 st.markdown("""
@@ -107,10 +105,12 @@ def show_login():
                     # COPPA Compliance Check for Children - VISIBLE IN UI
                     if user['role'] == 'child':
                         with st.spinner("🔐 Verifying parental consent..."):
-                            time.sleep(1.5)  # Demo effect
+                            if DEMO_DELAYS_ENABLED:
+                                time.sleep(1.5)  # Demo effect
                         st.success("✅ COPPA Compliance: Parental consent verified")
                         st.info("✅ Age-appropriate content filters activated")
-                        time.sleep(1)  # Let them see the messages
+                        if DEMO_DELAYS_ENABLED:
+                            time.sleep(1)  # Let them see the messages
                     
                     
                     for key in list(st.session_state.keys()):
@@ -186,7 +186,7 @@ def main():
         if st.button("Logout", use_container_width=True):
             st.session_state.auth_manager.logout(user['session_id'])
             for key in list(st.session_state.keys()):
-                if key not in ['auth_manager', 'bedrock_client', 'conversation_manager', 'guardrails']:
+                if key not in services.names():
                     del st.session_state[key]
             st.rerun()
     
@@ -0,0 +1,92 @@
+"""
+Write throughput and startup replay time of the conversation event log.
+
+Many threads add messages at once (as concurrent chat turns do) under each sync
+mode, then the store is reopened from disk, first replaying the raw log and then
+after a snapshot, to show what compaction saves at startup.
+
+    python benchmarks/event_log_bench.py --threads 32 --messages 200
+    python benchmarks/event_log_bench.py --modes group --dir /var/tmp/jurneego-log
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.event_log import SYNC_MODES, EventLogConversationStore  # noqa: E402
+
+
+def write_load(store, threads, messages):
+    conv_ids = []
+    for index in range(threads):
+        conv_id = f"conv_bench_{index:04d}"
+        store.create_conversation({
+            'id': conv_id, 'user_id': f"child_{index}", 'user_role': 'child', 'parent_id': 'parent_bench',
+            'created_at': '2024-01-01T00:00:00', 'messages': [], 'bookmarks': [], 'flags': []
+        })
+        conv_ids.append(conv_id)
+
+    def chat(conv_id):
+        for number in range(messages):
+            store.add_message(conv_id, {
+                'id': f"{conv_id}_msg_{number:05d}", 'role': 'user' if number % 2 == 0 else 'assistant',
+                'content': 'Why is the sky blue? ' * 4, 'timestamp': '2024-01-01T00:00:00',
+                'metadata': {'blocked': False}, 'reactions': [], 'curator_notes': []
+            })
+
+    workers = [threading.Thread(target=chat, args=(conv_id,)) for conv_id in conv_ids]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+
+def timed_open(directory, mode):
+    started = time.perf_counter()
+    store = EventLogConversationStore(directory, sync=mode, snapshot_every=0)
+    elapsed = time.perf_counter() - started
+    return store, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32, help='concurrent writers')
+    parser.add_argument('--messages', type=int, default=200, help='messages per writer')
+    parser.add_argument('--modes', default=','.join(SYNC_MODES), help='comma separated sync modes')
+    parser.add_argument('--dir', help='where to put the logs (default: a temporary directory)')
+    args = parser.parse_args()
+
+    base = args.dir or tempfile.mkdtemp(prefix='event-log-bench-')
+    total = args.threads * args.messages
+    try:
+        for mode in args.modes.split(','):
+            directory = os.path.join(base, mode)
+            shutil.rmtree(directory, ignore_errors=True)
+
+            store = EventLogConversationStore(directory, sync=mode, snapshot_every=0)
+            elapsed = write_load(store, args.threads, args.messages)
+            store.close()
+            stats = store.log.stats()
+            print(f"{mode:<9} {total} messages in {elapsed:.2f}s = {total / elapsed:9.0f} msg/s, "
+                  f"{stats['commits']} commits ({stats['appended'] / max(1, stats['commits']):.1f} events each)")
+
+            store, replay_sec = timed_open(directory, mode)
+            store.snapshot()
+            store.close()
+            store, snapshot_sec = timed_open(directory, mode)
+            store.close()
+            print(f"{'':<9} startup: replay {replay_sec * 1000:.0f} ms, from snapshot {snapshot_sec * 1000:.0f} ms")
+    finally:
+        if not args.dir:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+In-process stand-in for the boto3 bedrock-runtime client, for load tests.
+
+Implements invoke_model and invoke_model_with_response_stream with the
+Anthropic message format BedrockClient reads. Latency, token rate, throttling
+and concurrency can be configured, so capacity runs need neither AWS
+credentials nor boto3:
+
+    client = BedrockClient(bedrock_runtime=FakeBedrockRuntime(latency=0.3))
+"""
+import io
+import json
+import random
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+FILLER_WORDS = (
+    "that is a great question let's explore it together plants use sunlight water and air "
+    "to make their own food which is called photosynthesis and it happens in the leaves"
+).split()
+
+
+class FakeClientError(Exception):
+    """Shaped like botocore's ClientError so the retry logic classifies it the same way"""
+
+    def __init__(self, code: str, status: int):
+        super().__init__(f"An error occurred ({code})")
+        self.response = {'Error': {'Code': code, 'Message': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}
+
+
+class FakeBedrockRuntime:
+    """
+    latency         seconds before the first token (jittered by +-`jitter` fraction)
+    tokens_per_sec  generation speed; the reply takes output_tokens / tokens_per_sec
+    output_tokens   words in each reply
+    throttle_rate   fraction of calls rejected with ThrottlingException
+    max_concurrency calls beyond this many in flight are throttled (0 = unlimited)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.5,
+        tokens_per_sec: float = 50,
+        output_tokens: int = 60,
+        throttle_rate: float = 0.0,
+        max_concurrency: int = 0,
+        jitter: float = 0.2,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.tokens_per_sec = tokens_per_sec
+        self.output_tokens = output_tokens
+        self.throttle_rate = throttle_rate
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.counters = {'calls': 0, 'throttled': 0, 'max_in_flight': 0}
+
+    def _admit(self):
+        with self._lock:
+            self.counters['calls'] += 1
+            throttled = self._random.random() < self.throttle_rate or (
+                self.max_concurrency and self._in_flight >= self.max_concurrency
+            )
+            if throttled:
+                self.counters['throttled'] += 1
+                raise FakeClientError('ThrottlingException', 429)
+            self._in_flight += 1
+            self.counters['max_in_flight'] = max(self.counters['max_in_flight'], self._in_flight)
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _first_token_delay(self) -> float:
+        with self._lock:
+            spread = self._random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency * (1 + spread))
+
+    def _words(self, body: str):
+        # Roughly four characters per token, like the history budget estimate
+        prompt_tokens = len(body) // 4
+        words = [FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(self.output_tokens)]
+        return prompt_tokens, words
+
+    def invoke_model(self, modelId: str, body: str, **kwargs) -> Dict:
+        self._admit()
+        try:
+            prompt_tokens, words = self._words(body)
+            time.sleep(self._first_token_delay() + len(words) / self.tokens_per_sec)
+            payload = {
+                'content': [{'type': 'text', 'text': ' '.join(words)}],
+                'usage': {'input_tokens': prompt_tokens, 'output_tokens': len(words)}
+            }
+            return {'body': io.BytesIO(json.dumps(payload).encode())}
+        finally:
+            self._release()
+
+    def invoke_model_with_response_stream(self, modelId: str, body: str, **kwargs) -> Dict:
+        self._admit()
+        try:
+            prompt_tokens, words = self._words(body)
+            time.sleep(self._first_token_delay())
+        except Exception:
+            self._release()
+            raise
+        return {'body': self._events(prompt_tokens, words)}
+
+    def _events(self, prompt_tokens: int, words) -> Iterator[Dict]:
+        try:
+            yield self._event({'type': 'message_start', 'message': {'usage': {'input_tokens': prompt_tokens}}})
+            for index, word in enumerate(words):
+                time.sleep(1 / self.tokens_per_sec)
+                text = word if index == 0 else f" {word}"
+                yield self._event({'type': 'content_block_delta', 'delta': {'type': 'text_delta', 'text': text}})
+            yield self._event({'type': 'message_delta', 'usage': {'output_tokens': len(words)}})
+            yield self._event({'type': 'message_stop'})
+        finally:
+            self._release()
+
+    @staticmethod
+    def _event(data: Dict) -> Dict:
+        return {'chunk': {'bytes': json.dumps(data).encode()}}
@@ -0,0 +1,181 @@
+"""
+Latency, throughput and accuracy of COPPAGuardrails on the labeled corpus.
+
+Times check_message_safety, sanitize_response and analyze_message_context
+per message (scan cache disabled, so every call does the full work) and scores
+the results against the corpus labels. Results are written as JSON so runs on
+different commits can be compared:
+
+    python benchmarks/guardrails_bench.py --output before.json
+    python benchmarks/guardrails_bench.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from guardrails_corpus import build_corpus  # noqa: E402
+from core.guardrails import COPPAGuardrails  # noqa: E402
+
+CHILD_AGE = 9
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timing_summary(latencies):
+    total = sum(latencies)
+    return {
+        'calls': len(latencies),
+        'p50_us': percentile(latencies, 50) * 1e6,
+        'p99_us': percentile(latencies, 99) * 1e6,
+        'mean_us': total / len(latencies) * 1e6,
+        'throughput_per_sec': len(latencies) / total if total else 0.0
+    }
+
+
+def timed(func, args_list, repeat):
+    """Per-call latencies and results of the last repetition"""
+    latencies = []
+    results = []
+    for _ in range(repeat):
+        results = []
+        for args in args_list:
+            started = time.perf_counter()
+            results.append(func(*args))
+            latencies.append(time.perf_counter() - started)
+    return latencies, results
+
+
+def precision_recall(expected, predicted):
+    tp = sum(1 for e, p in zip(expected, predicted) if e and p)
+    fp = sum(1 for e, p in zip(expected, predicted) if p and not e)
+    fn = sum(1 for e, p in zip(expected, predicted) if e and not p)
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1, 'true_positives': tp,
+            'false_positives': fp, 'false_negatives': fn}
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def run(size, seed, repeat):
+    corpus = build_corpus(size, seed)
+    texts = [sample['text'] for sample in corpus]
+
+    guardrails = COPPAGuardrails()
+    guardrails.scan_cache_size = 0
+
+    safety_latencies, safety_results = timed(
+        guardrails.check_message_safety, [(text, CHILD_AGE) for text in texts], repeat
+    )
+    sanitize_latencies, sanitized = timed(guardrails.sanitize_response, [(text,) for text in texts], repeat)
+    # A few hundred distinct children, so contexts fill and roll over as in production
+    context_latencies, contexts = timed(
+        guardrails.analyze_message_context, [(f"child_{i % 300}", text) for i, text in enumerate(texts)], 1
+    )
+
+    blocked = [not result[0] for result in safety_results]
+    per_category = {}
+    for category in sorted({sample['category'] for sample in corpus}):
+        indexes = [i for i, sample in enumerate(corpus) if sample['category'] == category]
+        per_category[category] = {
+            'samples': len(indexes),
+            'blocked_rate': sum(blocked[i] for i in indexes) / len(indexes),
+            'expected_blocked_rate': sum(corpus[i]['unsafe'] for i in indexes) / len(indexes)
+        }
+
+    pii_samples = [i for i, sample in enumerate(corpus) if sample['pii']]
+    clean_samples = [i for i, sample in enumerate(corpus) if sample['category'] == 'safe']
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'corpus': {'size': size, 'seed': seed, 'repeat': repeat},
+        'timings': {
+            'check_message_safety': timing_summary(safety_latencies),
+            'sanitize_response': timing_summary(sanitize_latencies),
+            'analyze_message_context': timing_summary(context_latencies)
+        },
+        'accuracy': {
+            'check_message_safety': precision_recall([s['unsafe'] for s in corpus], blocked),
+            'per_category': per_category,
+            'sanitize_response': {
+                'pii_removed_rate': sum(corpus[i]['pii'] not in sanitized[i] for i in pii_samples) / len(pii_samples),
+                'clean_unchanged_rate': sum(sanitized[i] == texts[i] for i in clean_samples) / len(clean_samples)
+            },
+            'analyze_message_context': precision_recall(
+                [s['coded'] for s in corpus],
+                [any(p.startswith('coded_language') for p in result['patterns']) for result in contexts]
+            )
+        }
+    }
+
+
+def print_report(results, baseline=None):
+    print(f"commit {results['commit']}  corpus {results['corpus']}")
+    for name, timing in results['timings'].items():
+        line = (f"  {name:<24} p50 {timing['p50_us']:8.1f} us  p99 {timing['p99_us']:8.1f} us  "
+                f"{timing['throughput_per_sec']:10.0f} msg/s")
+        if baseline and name in baseline.get('timings', {}):
+            before = baseline['timings'][name]['p50_us']
+            line += f"  p50 {(timing['p50_us'] - before) / before * 100:+.1f}% vs {baseline.get('commit')}"
+        print(line)
+
+    accuracy = results['accuracy']
+    for name in ('check_message_safety', 'analyze_message_context'):
+        scores = accuracy[name]
+        line = f"  {name:<24} precision {scores['precision']:.3f}  recall {scores['recall']:.3f}  f1 {scores['f1']:.3f}"
+        if baseline:
+            before = baseline['accuracy'][name]
+            line += f"  (was {before['precision']:.3f} / {before['recall']:.3f})"
+        print(line)
+    for category, stats in accuracy['per_category'].items():
+        print(f"    {category:<8} blocked {stats['blocked_rate']:.3f} (expected {stats['expected_blocked_rate']:.3f})")
+    sanitize = accuracy['sanitize_response']
+    print(f"  sanitize_response        PII removed {sanitize['pii_removed_rate']:.3f}  "
+          f"clean unchanged {sanitize['clean_unchanged_rate']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=2000, help='corpus size')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=3, help='timing passes over the corpus')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', help='results JSON from an earlier run to compare against')
+    args = parser.parse_args()
+
+    results = run(args.size, args.seed, args.repeat)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
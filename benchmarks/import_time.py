@@ -0,0 +1,86 @@
+"""
+Cold-start import budget for the app's core package.
+
+Runs the app's startup imports and services in a fresh interpreter with
+`python -X importtime` and fails if heavy optional modules are pulled in or
+the cumulative import time of `core` exceeds the budget.
+
+    python benchmarks/import_time.py
+    IMPORT_BUDGET_MS=200 python benchmarks/import_time.py
+
+tests/test_import_time.py runs the same check under pytest.
+"""
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', '150'))
+# Modules that must only load on the pages or code paths that use them
+FORBIDDEN = ('boto3', 'botocore', 'pandas')
+# Timed inside the child so interpreter startup isn't counted
+STARTUP_CODE = (
+    "import time\n"
+    "started = time.perf_counter()\n"
+    "import core\n"
+    "from core.services import STARTUP_SERVICES\n"
+    "services = core.get_services()\n"
+    "for name in STARTUP_SERVICES:\n"
+    "    services.get(name)\n"
+    "print((time.perf_counter() - started) * 1000)\n"
+)
+
+
+def measure_startup():
+    """
+    Milliseconds spent importing core and creating the startup services, and
+    the modules -X importtime saw with their cumulative time in microseconds.
+    Modules loaded through importlib (the lazy service factories) are not
+    reported by -X importtime themselves, only the imports they trigger.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(result.returncode)
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        timings[name] = max(timings.get(name, 0), int(cumulative))
+    return float(result.stdout.strip().splitlines()[-1]), timings
+
+
+def main():
+    startup_ms, timings = measure_startup()
+    failures = []
+
+    print(f"core startup: {startup_ms:.1f} ms (budget {BUDGET_MS:.0f} ms)")
+    if startup_ms > BUDGET_MS:
+        failures.append(f"startup took {startup_ms:.1f} ms, over the {BUDGET_MS:.0f} ms budget")
+
+    for name in FORBIDDEN:
+        if name in timings:
+            failures.append(f"{name} was imported at startup")
+
+    print("slowest imports:")
+    slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:8]
+    for name, us in slowest:
+        print(f"  {name:<28} {us / 1000:7.1f} ms")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
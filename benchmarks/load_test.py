@@ -0,0 +1,237 @@
+"""
+Headless load test of the child chat flow against a fake Bedrock runtime.
+
+Each simulated child runs the same steps as pages/child_chat.py for every
+question: check_message_safety, add_message (user), flag_content when blocked,
+generate_response (or the streaming variant), sanitize_response and
+add_message (assistant). Reports throughput, p50/p95/p99 per stage, Bedrock
+counters and memory growth.
+
+    python benchmarks/load_test.py --users 50 --messages 10 --latency 0.5 --tokens-per-sec 80
+    python benchmarks/load_test.py --users 200 --stream --throttle-rate 0.05 --output load.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+STAGES = ['safety_check', 'store_user_message', 'generate', 'first_token', 'sanitize',
+          'store_assistant_message', 'turn']
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def rss_mb() -> float:
+    # ru_maxrss is KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageTimer:
+    """Collects per-stage latencies from all simulated users"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.samples[stage].append(seconds)
+
+    def summary(self):
+        return {
+            stage: {
+                'count': len(self.samples[stage]),
+                'p50_ms': percentile(self.samples[stage], 50) * 1000,
+                'p95_ms': percentile(self.samples[stage], 95) * 1000,
+                'p99_ms': percentile(self.samples[stage], 99) * 1000,
+                'max_ms': max(self.samples[stage]) * 1000
+            }
+            for stage in STAGES if self.samples[stage]
+        }
+
+
+def simulate_child(index, args, services, questions, timer, errors):
+    from core.constants import HISTORY_MESSAGE_LIMIT
+
+    guardrails = services['guardrails']
+    conversations = services['conversation_manager']
+    bedrock = services['bedrock_client']
+    rng = random.Random(args.seed + index)
+
+    child_id = f"load_child_{index}"
+    age = rng.randint(6, 12)
+    conv_id = conversations.create_conversation(child_id, 'child', parent_id=f"load_parent_{index % 50}")
+
+    for _ in range(args.messages):
+        prompt = rng.choice(questions)
+        turn_started = time.perf_counter()
+
+        started = time.perf_counter()
+        is_safe, issues, redirect, severity = guardrails.check_message_safety(prompt, age, child_id)
+        timer.record('safety_check', time.perf_counter() - started)
+
+        started = time.perf_counter()
+        user_msg = conversations.add_message(conv_id, 'user', prompt, metadata={
+            'blocked': not is_safe,
+            'safety_issues': issues if not is_safe else [],
+            'redirect_message': redirect if not is_safe else None,
+            'severity': severity
+        })
+        if not is_safe:
+            conversations.flag_content(conv_id, user_msg['id'], 'system', 'system',
+                                       f"Safety concern ({severity}) - Issues: {', '.join(issues)}",
+                                       highlighted_text=prompt)
+        timer.record('store_user_message', time.perf_counter() - started)
+
+        history = list(conversations.iter_messages(conv_id, limit=HISTORY_MESSAGE_LIMIT + 1))[:-1]
+        context = {
+            'interests': ['science'],
+            'learning_level': f'grade_{age - 5}',
+            'conversation_id': conv_id,
+            'safety_concern': not is_safe,
+            'safety_issues': issues if not is_safe else []
+        }
+
+        started = time.perf_counter()
+        if args.stream:
+            response = bedrock.generate_response_stream(prompt, 'child', age, context, history)
+            sanitizer = guardrails.stream_sanitizer()
+            text = ''
+            first_token = True
+            for chunk in response.pop('stream'):
+                if first_token:
+                    timer.record('first_token', time.perf_counter() - started)
+                    first_token = False
+                text += sanitizer.feed(chunk)
+            text += sanitizer.flush()
+            timer.record('generate', time.perf_counter() - started)
+        else:
+            response = bedrock.generate_response(prompt, 'child', age, context, history)
+            timer.record('generate', time.perf_counter() - started)
+            started = time.perf_counter()
+            text = guardrails.sanitize_response(response['response'])
+            timer.record('sanitize', time.perf_counter() - started)
+
+        if response.get('error'):
+            errors.append(response['error'])
+
+        started = time.perf_counter()
+        conversations.add_message(conv_id, 'assistant', text, metadata=response)
+        timer.record('store_assistant_message', time.perf_counter() - started)
+        timer.record('turn', time.perf_counter() - turn_started)
+
+        if args.think_time:
+            time.sleep(rng.uniform(0, 2 * args.think_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50, help='simulated children chatting at once')
+    parser.add_argument('--messages', type=int, default=10, help='questions per child')
+    parser.add_argument('--think-time', type=float, default=0.0, help='mean seconds between questions')
+    parser.add_argument('--stream', action='store_true', help='use generate_response_stream like the chat page')
+    parser.add_argument('--latency', type=float, default=0.5, help='fake Bedrock seconds to first token')
+    parser.add_argument('--tokens-per-sec', type=float, default=50)
+    parser.add_argument('--output-tokens', type=int, default=60)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--bedrock-concurrency', type=int, default=0,
+                        help='fake Bedrock throttles beyond this many in-flight calls (0 = unlimited)')
+    parser.add_argument('--cache', action='store_true', help='keep the response cache enabled')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write results JSON here')
+    args = parser.parse_args()
+
+    # Settings BedrockClient reads from the environment
+    if not args.cache:
+        os.environ['RESPONSE_CACHE_SIZE'] = '0'
+
+    from fake_bedrock import FakeBedrockRuntime
+    from guardrails_corpus import build_corpus
+    from core.bedrock_client import BedrockClient
+    from core.conversation import ConversationManager
+    from core.guardrails import COPPAGuardrails
+
+    tracemalloc.start()
+    rss_before = rss_mb()
+    runtime = FakeBedrockRuntime(
+        latency=args.latency,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=args.output_tokens,
+        throttle_rate=args.throttle_rate,
+        max_concurrency=args.bedrock_concurrency,
+        seed=args.seed
+    )
+    services = {
+        'guardrails': COPPAGuardrails(),
+        'conversation_manager': ConversationManager(),
+        'bedrock_client': BedrockClient(bedrock_runtime=runtime)
+    }
+    questions = [sample['text'] for sample in build_corpus(500, args.seed)]
+    traced_before, _ = tracemalloc.get_traced_memory()
+
+    timer = StageTimer()
+    errors = []
+    threads = [
+        threading.Thread(target=simulate_child, args=(i, args, services, questions, timer, errors), daemon=True)
+        for i in range(args.users)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    traced_after, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    turns = len(timer.samples['turn'])
+
+    results = {
+        'config': vars(args),
+        'elapsed_sec': elapsed,
+        'turns': turns,
+        'throughput_turns_per_sec': turns / elapsed if elapsed else 0.0,
+        'errors': len(errors),
+        'stages': timer.summary(),
+        'bedrock': {'fake_runtime': runtime.counters, 'resilience': services['bedrock_client'].get_resilience_stats()},
+        'memory': {
+            'python_heap_growth_mb': (traced_after - traced_before) / (1024 * 1024),
+            'python_heap_peak_mb': traced_peak / (1024 * 1024),
+            'rss_growth_mb': rss_mb() - rss_before,
+            'heap_growth_per_turn_kb': (traced_after - traced_before) / 1024 / turns if turns else 0.0
+        }
+    }
+
+    print(f"{args.users} users x {args.messages} messages: {turns} turns in {elapsed:.1f}s "
+          f"= {results['throughput_turns_per_sec']:.1f} turns/s, {len(errors)} errors")
+    for stage, stats in results['stages'].items():
+        print(f"  {stage:<24} p50 {stats['p50_ms']:9.2f} ms  p95 {stats['p95_ms']:9.2f} ms  "
+              f"p99 {stats['p99_ms']:9.2f} ms")
+    print(f"  fake bedrock {runtime.counters}")
+    memory = results['memory']
+    print(f"  memory: heap +{memory['python_heap_growth_mb']:.1f} MB "
+          f"({memory['heap_growth_per_turn_kb']:.1f} KB/turn), RSS +{memory['rss_growth_mb']:.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
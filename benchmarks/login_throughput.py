@@ -0,0 +1,73 @@
+"""
+Login throughput for AuthManager with the configured password hashing.
+
+Creates a class worth of child accounts, then signs them in from many threads
+at once (a school's morning login) and reports logins/sec and latency
+percentiles, first with cold verification caches and then with repeat logins.
+
+    python benchmarks/login_throughput.py --users 200 --threads 32
+    BCRYPT_ROUNDS=10 PASSWORD_HASH_WORKERS=4 python benchmarks/login_throughput.py
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SESSION_SWEEP_INTERVAL', '0')
+
+from core.auth import AuthManager  # noqa: E402
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_logins(auth, credentials, threads):
+    def login(credential):
+        started = time.perf_counter()
+        user = auth.authenticate(*credential)
+        if user is None:
+            raise RuntimeError(f"login failed for {credential[0]}")
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = list(executor.map(login, credentials))
+    return time.perf_counter() - started, latencies
+
+
+def report(label, elapsed, latencies):
+    print(f"{label}: {len(latencies)} logins in {elapsed:.2f}s = {len(latencies) / elapsed:.1f} logins/sec, "
+          f"p50 {percentile(latencies, 50) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=32, help='concurrent login requests (script threads)')
+    args = parser.parse_args()
+
+    auth = AuthManager()
+    hasher = auth.password_hasher
+    print(f"scheme={hasher.scheme} bcrypt_rounds={hasher.bcrypt_rounds} "
+          f"pbkdf2_iterations={hasher.pbkdf2_iterations} workers={hasher.workers}")
+
+    started = time.perf_counter()
+    credentials = []
+    for i in range(args.users):
+        username = f"bench_child_{i}"
+        auth.create_child_account(username, f"password-{i}", f"Child {i}", 9, 'parent_001')
+        credentials.append((username, f"password-{i}"))
+    print(f"created {args.users} accounts in {time.perf_counter() - started:.2f}s")
+
+    report("first login ", *run_logins(auth, credentials, args.threads))
+    report("repeat login", *run_logins(auth, credentials, args.threads))
+    print(hasher.stats())
+
+
+if __name__ == '__main__':
+    main()
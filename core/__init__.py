@@ -1,14 +1,35 @@
 # Core module initialization
-from .auth import AuthManager
-from .bedrock_client import BedrockClient
-from .conversation import ConversationManager
-from .guardrails import COPPAGuardrails
+# Service classes are imported on first access so `import core` stays cheap
+# (boto3 in particular is only loaded when a BedrockClient is created)
+import importlib
 from . import constants
 
+_LAZY_EXPORTS = {
+    'AuthManager': '.auth',
+    'BedrockClient': '.bedrock_client',
+    'ConversationManager': '.conversation',
+    'COPPAGuardrails': '.guardrails',
+    'KeywordMatcher': '.keyword_matcher',
+    'ServiceRegistry': '.services',
+    'get_services': '.services'
+}
+
 __all__ = [
     'AuthManager',
     'BedrockClient',
     'ConversationManager',
     'COPPAGuardrails',
+    'KeywordMatcher',
+    'ServiceRegistry',
+    'get_services',
     'constants'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,126 @@
+from collections import Counter, deque
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+
+def flag_severity(reason: str) -> str:
+    """Severity encoded in a flag reason such as 'Safety concern (HIGH) - ...'"""
+    for level in ('CRITICAL', 'HIGH', 'MEDIUM'):
+        if level in reason:
+            return level
+    return 'LOW'
+
+
+def blocked_severity(issues_str: str) -> str:
+    """Severity for a blocked message from its joined safety issues"""
+    issues_lower = issues_str.lower()
+    if any(term in issues_lower for term in ['self-harm', 'suicide', 'kill myself']):
+        return 'CRITICAL'
+    elif any(term in issues_lower for term in ['drugs', 'violence', 'weapons']):
+        return 'HIGH'
+    elif any(term in issues_lower for term in ['alcohol', 'inappropriate']):
+        return 'MEDIUM'
+    return 'HIGH'
+
+
+class ChildAnalytics:
+    """
+    Running aggregates for the conversations linked to one parent, updated as
+    messages and flags are recorded so dashboard reads don't depend on history length.
+    Only the most recent `max_events` safety events are kept for the detail table.
+    """
+
+    def __init__(self, max_events: int = 500):
+        self.conversation_count = 0
+        self.total_messages = 0
+        self.blocked_count = 0
+        self.flag_count = 0
+        self.topics = Counter()
+        self.daily_counts = Counter()
+        self.severity_counts = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0}
+        self.safety_events = deque(maxlen=max_events)
+        self.critical_alerts = deque(maxlen=max_events)
+
+    def record_conversation(self):
+        self.conversation_count += 1
+
+    def record_message(self, message: Dict):
+        self.total_messages += 1
+        self.daily_counts[message['timestamp'][:10]] += 1
+
+        if message['role'] != 'user':
+            return
+
+        for word in message['content'].lower().split():
+            if len(word) > 4:
+                self.topics[word] += 1
+
+        metadata = message.get('metadata') or {}
+        if metadata.get('blocked') and metadata.get('safety_issues'):
+            issues_str = ', '.join(metadata['safety_issues'])
+            severity = blocked_severity(issues_str)
+            self.blocked_count += 1
+            self.severity_counts[severity] += 1
+            self.safety_events.append({
+                'Date': message.get('timestamp', '')[:10] if message.get('timestamp') else 'Unknown',
+                'Time': message.get('timestamp', '')[11:19] if message.get('timestamp') else '',
+                'Type': f"Blocked: {issues_str}",
+                'Severity': severity,
+                'Status': 'blocked',
+                'Message': message.get('content', '')[:50] + '...' if message.get('content') else 'N/A'
+            })
+
+    def record_flag(self, flag: Dict):
+        severity = flag_severity(flag['reason'])
+        self.flag_count += 1
+        self.severity_counts[severity] += 1
+        self.safety_events.append({
+            'Date': flag['timestamp'][:10],
+            'Time': flag['timestamp'][11:19],
+            'Type': flag['reason'],
+            'Severity': severity,
+            'Status': flag['status'],
+            'Message': flag.get('highlighted_text', 'N/A')[:50] + '...' if flag.get('highlighted_text') else 'N/A'
+        })
+        if 'CRITICAL' in flag['reason']:
+            self.critical_alerts.append({
+                'time': flag['timestamp'],
+                'message': flag.get('highlighted_text', 'N/A'),
+                'reason': flag['reason']
+            })
+
+
+def summarize(children: Iterable[ChildAnalytics], top_n: int = 10) -> Dict:
+    """Merge per-child aggregates into the numbers the parent dashboard shows"""
+    summary = {
+        'conversation_count': 0,
+        'total_messages': 0,
+        'messages_today': 0,
+        'blocked_count': 0,
+        'flag_count': 0,
+        'severity_counts': {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0},
+        'safety_event_count': 0,
+        'safety_events': [],
+        'critical_alerts': []
+    }
+    topics = Counter()
+    daily_counts = Counter()
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    for child in children:
+        summary['conversation_count'] += child.conversation_count
+        summary['total_messages'] += child.total_messages
+        summary['messages_today'] += child.daily_counts.get(today, 0)
+        summary['blocked_count'] += child.blocked_count
+        summary['flag_count'] += child.flag_count
+        for level, count in child.severity_counts.items():
+            summary['severity_counts'][level] += count
+        summary['safety_events'].extend(child.safety_events)
+        summary['critical_alerts'].extend(child.critical_alerts)
+        topics.update(child.topics)
+        daily_counts.update(child.daily_counts)
+
+    summary['safety_event_count'] = summary['blocked_count'] + summary['flag_count']
+    summary['top_topics'] = topics.most_common(top_n)
+    summary['daily_counts'] = sorted(daily_counts.items())
+    return summary
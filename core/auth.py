@@ -1,19 +1,26 @@
 from typing import Dict, Optional
-import hashlib
 import json
 from datetime import datetime
+from .ids import new_id
+from .passwords import PasswordHasher, create_password_hasher, legacy_sha256
+from .sessions import SessionStore, create_session_store
 
 class AuthManager:
     """Simple authentication for prototype - replace with proper auth in production"""
     
-    def __init__(self):
+    def __init__(self, session_store: Optional[SessionStore] = None, password_hasher: Optional[PasswordHasher] = None):
+        # bcrypt (or the configured scheme) on a bounded worker pool
+        self.password_hasher = password_hasher or create_password_hasher()
+        
         # In production, this would use AWS Cognito or similar
-        # For prototype, we use simple in-memory storage
+        # For prototype, we use simple in-memory storage.
+        # Demo users keep legacy SHA-256 hashes so startup stays cheap; they are
+        # upgraded to the current scheme on first login
         self.users = {
             # Demo users
             'parent_demo': {
                 'id': 'parent_001',
-                'password_hash': self._hash_password('parent123'),
+                'password_hash': legacy_sha256('parent123'),
                 'role': 'parent',
                 'name': 'Demo Parent',
                 'email': 'parent@demo.com',
@@ -21,7 +28,7 @@ class AuthManager:
             },
             'child_demo': {
                 'id': 'child_001',
-                'password_hash': self._hash_password('child123'),
+                'password_hash': legacy_sha256('child123'),
                 'role': 'child',
                 'name': 'Demo Child',
                 'age': 10,
@@ -31,7 +38,7 @@ class AuthManager:
             },
             'teacher_demo': {
                 'id': 'teacher_001',
-                'password_hash': self._hash_password('teacher123'),
+                'password_hash': legacy_sha256('teacher123'),
                 'role': 'teacher',
                 'name': 'Demo Teacher',
                 'email': 'teacher@school.com',
@@ -39,7 +46,11 @@ class AuthManager:
             }
         }
         
-        self.sessions = {}
+        # user id -> user record, so lookups by id don't scan every user
+        self.users_by_id = {user['id']: user for user in self.users.values()}
+        
+        # Sessions expire after SESSION_TTL seconds without use
+        self.sessions = session_store or create_session_store()
         self.parental_consents = {
             'child_001': {
                 'parent_id': 'parent_001',
@@ -51,8 +62,8 @@ class AuthManager:
         }
     
     def _hash_password(self, password: str) -> str:
-        """Simple password hashing - use bcrypt in production"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Salted, slow hash computed off the calling thread"""
+        return self.password_hasher.hash(password)
     
     def authenticate(self, username: str, password: str) -> Optional[Dict]:
         """Authenticate user and return user data"""
@@ -61,17 +72,22 @@ class AuthManager:
         if not user:
             return None
         
-        if user['password_hash'] != self._hash_password(password):
+        if not self.password_hasher.verify(password, user['password_hash']):
             return None
         
+        # Transparently move legacy or lower-cost hashes to the current settings
+        new_hash = self.password_hasher.upgrade(password, user['password_hash'])
+        if new_hash:
+            user['password_hash'] = new_hash
         
-        session_id = f"session_{datetime.now().strftime('%Y%m%d%H%M%S')}_{user['id']}"
-        self.sessions[session_id] = {
+        
+        session_id = new_id('session')
+        self.sessions.create(session_id, {
             'user_id': user['id'],
             'username': username,
             'role': user['role'],
             'created_at': datetime.now().isoformat()
-        }
+        })
         
         user_data = {k: v for k, v in user.items() if k != 'password_hash'}
         user_data['session_id'] = session_id
@@ -100,10 +116,8 @@ class AuthManager:
     
     def verify_parent_child_relationship(self, parent_id: str, child_id: str) -> bool:
         """Verify parent-child relationship"""
-        for username, user in self.users.items():
-            if user['id'] == child_id and user.get('parent_id') == parent_id:
-                return True
-        return False
+        child = self.users_by_id.get(child_id)
+        return child is not None and child.get('parent_id') == parent_id
     
     def create_child_account(
         self, 
@@ -118,9 +132,9 @@ class AuthManager:
         if username in self.users:
             return None
         
-        child_id = f"child_{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        child_id = new_id('child')
         
-        self.users[username] = {
+        child = {
             'id': child_id,
             'password_hash': self._hash_password(password),
             'role': 'child',
@@ -130,6 +144,8 @@ class AuthManager:
             'interests': [],
             'learning_level': f'grade_{age - 5}'  
         }
+        self.users[username] = child
+        self.users_by_id[child_id] = child
         
         
         self.parental_consents[child_id] = {
@@ -141,18 +157,12 @@ class AuthManager:
         }
         
         
-        for username, user in self.users.items():
-            if user['id'] == parent_id:
-                if 'children' not in user:
-                    user['children'] = []
-                user['children'].append(child_id)
-                break
+        parent = self.users_by_id.get(parent_id)
+        if parent is not None:
+            parent.setdefault('children', []).append(child_id)
         
         return child_id
     
     def logout(self, session_id: str) -> bool:
         """Logout user"""
-        if session_id in self.sessions:
-            del self.sessions[session_id]
-            return True
-        return False
\ No newline at end of file
+        return self.sessions.delete(session_id)
\ No newline at end of file
@@ -0,0 +1,98 @@
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+
+class Subscription:
+    """
+    One subscriber's view of a parent's channel. Events are buffered up to
+    `max_pending`; if the subscriber falls further behind the oldest are dropped
+    and `overflowed` is set so it can fall back to a full reload.
+    """
+
+    def __init__(self, feed: 'ChangeFeed', parent_id: str, max_pending: int = 500):
+        self.feed = feed
+        self.parent_id = parent_id
+        self.overflowed = False
+        self.closed = False
+        self.last_poll = time.monotonic()
+        self._events = deque(maxlen=max_pending)
+        self._condition = threading.Condition()
+
+    def _push(self, event: Dict):
+        with self._condition:
+            if len(self._events) == self._events.maxlen:
+                self.overflowed = True
+            self._events.append(event)
+            self._condition.notify_all()
+
+    def poll(self, timeout: float = 0.0) -> List[Dict]:
+        """Events since the last poll, waiting up to `timeout` seconds for the first one"""
+        with self._condition:
+            if not self._events and timeout > 0 and not self.closed:
+                self._condition.wait(timeout)
+            events = list(self._events)
+            self._events.clear()
+            self.last_poll = time.monotonic()
+            return events
+
+    def close(self):
+        self.feed.unsubscribe(self)
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class ChangeFeed:
+    """
+    In-process pub/sub with one channel per parent. Publishing never blocks on
+    subscribers; subscriptions that haven't polled for `idle_timeout` seconds
+    (e.g. a closed browser tab) are dropped on the next publish.
+    """
+
+    def __init__(self, idle_timeout: float = 600):
+        self.idle_timeout = idle_timeout
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._sequence = itertools.count(1)
+
+    def subscribe(self, parent_id: str, max_pending: int = 500) -> Subscription:
+        subscription = Subscription(self, parent_id, max_pending)
+        with self._lock:
+            self._channels.setdefault(parent_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.parent_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._channels.pop(subscription.parent_id, None)
+
+    def publish(self, parent_id: str, event: Dict) -> int:
+        """Deliver an event to the parent's subscribers; returns how many received it"""
+        event = dict(event, seq=next(self._sequence))
+        now = time.monotonic()
+        with self._lock:
+            subscribers = self._channels.get(parent_id)
+            if not subscribers:
+                return 0
+            live = [s for s in subscribers if now - s.last_poll <= self.idle_timeout]
+            if len(live) != len(subscribers):
+                self._channels[parent_id] = live
+            if not live:
+                self._channels.pop(parent_id, None)
+                return 0
+
+        for subscription in live:
+            subscription._push(event)
+        return len(live)
+
+    def subscriber_count(self, parent_id: Optional[str] = None) -> int:
+        with self._lock:
+            if parent_id is not None:
+                return len(self._channels.get(parent_id, ()))
+            return sum(len(subscribers) for subscribers in self._channels.values())
@@ -1,3 +1,5 @@
+import os
+
 # Demo credentials
 DEMO_USERS = {
     'parent': {'username': 'parent_demo', 'password': 'parent123'},
@@ -5,6 +7,9 @@ DEMO_USERS = {
     'teacher': {'username': 'teacher_demo', 'password': 'teacher123'}
 }
 
+# Artificial pauses on the login screen; set JURNEEGO_DEMO_DELAYS=false in production
+DEMO_DELAYS_ENABLED = os.getenv('JURNEEGO_DEMO_DELAYS', 'true').lower() in ('1', 'true', 'yes')
+
 # Safety configuration
 BLOCKED_TOPICS = [
     'violence', 'drugs', 'alcohol', 'weapons', 'adult content',
@@ -20,6 +25,38 @@ SAFE_REDIRECTS = {
     'dangerous activities': "Safety first! How about we explore safe adventures and activities?"
 }
 
+# Literal terms matched by the keyword automaton (lower-case)
+CODED_TERMS = {
+    'unalive': 'self-harm',
+    'sewerslide': 'suicide',
+    'su1c1de': 'suicide',
+    '3d': 'eating disorder',
+    'sn0w': 'drugs',
+    'gr@ss': 'drugs',
+    'p1lls': 'drugs'
+}
+
+# Each sequence signals escalation when two of its phrases appear in recent messages
+ESCALATION_INDICATORS = [
+    ('thinking about', 'planning to', 'going to'),
+    ('sad', 'depressed', 'want to die'),
+    ('maybe', 'probably', 'definitely')
+]
+
+SEVERITY_KEYWORDS = {
+    'CRITICAL': ['suicide', 'self-harm', 'kill myself', 'end my life', 'throw myself'],
+    'HIGH': ['drugs', 'weapons', 'violence', 'abuse'],
+    'MEDIUM': ['alcohol', 'inappropriate content', 'adult content'],
+    'LOW': ['dating', 'romance', 'mild language']
+}
+
+# Demo-mode safety responses, checked in priority order
+DEMO_SAFETY_TERMS = {
+    'self-harm': ['kill myself', 'suicide', 'die', 'throw myself', 'end my life'],
+    'drugs': ['drugs', 'cocaine', 'weed', 'pills'],
+    'hurt': ['hurt', 'harm', 'cut']
+}
+
 # Child interface
 LEARNING_TIPS = [
     "Ask 'why' questions to learn more!",
@@ -34,6 +71,18 @@ SESSION_DURATION_WARNING = "**Session Time:** {} min limit"
 DEFAULT_WELCOME_MESSAGE = "👋 Hi! I'm JurneeGo, your learning buddy! Ask me anything you're curious about!"
 NEW_CHAT_MESSAGE = "👋 Hi! Ready for a new adventure? What would you like to learn about?"
 
+# Stored messages read per chat turn to build the model's history; older turns
+# survive only in the history summary
+HISTORY_MESSAGE_LIMIT = int(os.getenv('HISTORY_MESSAGE_LIMIT', '40'))
+
+# Parent dashboard live updates: how long each wait for new events lasts (also the
+# longest a click waits to be handled), how long a page run keeps streaming before
+# it reloads to resync reactions and notes, and how many dashboards may stream at
+# once (the rest fall back to manual refresh)
+LIVE_POLL_SECONDS = float(os.getenv('LIVE_POLL_SECONDS', '1'))
+LIVE_STREAM_SECONDS = float(os.getenv('LIVE_STREAM_SECONDS', '120'))
+LIVE_MAX_STREAMS = int(os.getenv('LIVE_MAX_STREAMS', '50'))
+
 # UI Messages
 SAVE_QUESTION_PLACEHOLDER = "What do you want to learn about later?"
 CHAT_INPUT_PLACEHOLDER = "What would you like to know? 🤔"
@@ -1,23 +1,52 @@
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Tuple
 import json
 import os
+import threading
+from .analytics import ChildAnalytics, blocked_severity, flag_severity, summarize
+from .change_feed import ChangeFeed
+from .ids import new_id
+from .metrics import stage_timer
+from .notifications import NotificationDispatcher, create_notification_dispatcher
+from .storage import ConversationStore, create_conversation_store
 
 class ConversationManager:
     """Manage conversations with parent monitoring capabilities"""
     
-    def __init__(self):
-        # In production, this would use DB of choice
-        # For prototype, we use in-memory storage
-        self.conversations = {}
-        self.parent_child_mapping = {}
-        self.flagged_content = []
+    def __init__(self, store: Optional[ConversationStore] = None, notifier: Optional[NotificationDispatcher] = None):
+        # SQLite when CONVERSATION_DB_PATH is set; in-memory, made durable by an
+        # event log when CONVERSATION_LOG_DIR is set; otherwise in-memory only
+        self.store = store if store is not None else create_conversation_store()
+        
+        # Parent notifications are delivered by background workers (sinks from NOTIFY_SINKS)
+        self.notifier = notifier if notifier is not None else create_notification_dispatcher()
+        
+        # Per-parent live updates for open dashboards (see ChangeFeed.subscribe)
+        self.change_feed = ChangeFeed()
+        
+        # Running aggregates for the parent dashboard, keyed by parent_id: like the
+        # original dashboard they cover every conversation whose parent_id is that
+        # parent. They only see writes made through this process: when several processes share
+        # one SQLite database, each one's aggregates miss the others' writes until it
+        # restarts and re-seeds from the store
+        self.analytics = {}
+        self._analytics_lock = threading.RLock()
+    
+    @property
+    def conversations(self) -> Dict:
+        """Every conversation by id, loaded from the store; prefer the paged store API for large stores"""
+        return {conv['id']: conv for conv in self.store.iter_conversations()}
+    
+    @property
+    def flagged_content(self) -> List[Dict]:
+        """All flags raised, oldest first"""
+        return self.store.get_flagged_content()
         
     def create_conversation(self, user_id: str, user_role: str, parent_id: Optional[str] = None) -> str:
         """Create a new conversation"""
-        conversation_id = f"conv_{datetime.now().strftime('%Y%m%d%H%M%S')}_{user_id}"
+        conversation_id = new_id('conv')
         
-        self.conversations[conversation_id] = {
+        conversation = {
             'id': conversation_id,
             'user_id': user_id,
             'user_role': user_role,
@@ -28,9 +57,11 @@ class ConversationManager:
             'flags': []
         }
         
-        # Map child to parent for monitoring
-        if user_role == 'child' and parent_id:
-            self.parent_child_mapping[user_id] = parent_id
+        self._tracked_write(
+            parent_id,
+            lambda: self.store.create_conversation(conversation) or True,
+            lambda analytics: analytics.record_conversation()
+        )
         
         return conversation_id
     
@@ -43,11 +74,8 @@ class ConversationManager:
     ) -> Dict:
         """Add a message to conversation"""
         
-        if conversation_id not in self.conversations:
-            raise ValueError(f"Conversation {conversation_id} not found")
-        
         message = {
-            'id': f"msg_{datetime.now().strftime('%Y%m%d%H%M%S')}",
+            'id': new_id('msg'),
             'role': role,
             'content': content,
             'timestamp': datetime.now().isoformat(),
@@ -56,28 +84,62 @@ class ConversationManager:
             'curator_notes': []
         }
         
-        self.conversations[conversation_id]['messages'].append(message)
+        info = self.store.get_conversation_info(conversation_id)
+        if info is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
+        
+        with stage_timer('store_message'):
+            conv = self._tracked_write(
+                info['parent_id'],
+                lambda: self.store.add_message(conversation_id, message),
+                lambda analytics: analytics.record_message(message)
+            )
+        if conv is None:
+            raise ValueError(f"Conversation {conversation_id} not found")
         
-        # Notify parent if child message (in production, this would be real-time)
-        conv = self.conversations[conversation_id]
+        # Notify parent if child message; queued, so it never slows the chat turn
         if conv['user_role'] == 'child' and conv['parent_id']:
-            self._notify_parent(conv['parent_id'], conversation_id, message)
+            self._notify_parent(conv['parent_id'], conversation_id, message, conv['user_id'])
+            self.change_feed.publish(conv['parent_id'], {
+                'type': 'message',
+                'conversation_id': conversation_id,
+                'child_id': conv['user_id'],
+                'message': message
+            })
         
         return message
     
     def get_conversation(self, conversation_id: str) -> Optional[Dict]:
         """Get a conversation by ID"""
-        return self.conversations.get(conversation_id)
+        return self.store.get_conversation(conversation_id)
     
     def get_child_conversations(self, parent_id: str) -> List[Dict]:
         """Get all conversations for children of a parent"""
-        child_convs = []
-        
-        for conv_id, conv in self.conversations.items():
-            if conv.get('parent_id') == parent_id:
-                child_convs.append(conv)
-        
-        return child_convs
+        return self.store.get_conversations_by_parent(parent_id)
+    
+    def list_conversations(
+        self,
+        parent_id: str,
+        cursor: Optional[str] = None,
+        limit: int = 20,
+        user_id: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        One page of a parent's child conversations, newest first, without messages.
+        Returns (page, next_cursor); pass next_cursor back to get the following page.
+        """
+        page = self.store.list_conversations(parent_id, before=cursor, limit=limit, user_id=user_id)
+        next_cursor = page[-1]['id'] if len(page) == limit else None
+        return page, next_cursor
+    
+    def iter_messages(
+        self,
+        conversation_id: str,
+        before: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """Yield up to `limit` messages preceding message id `before` (default: the latest), oldest first"""
+        return iter(self.store.get_messages(conversation_id, before=before, limit=limit))
     
     def add_parent_reaction(
         self, 
@@ -88,26 +150,19 @@ class ConversationManager:
     ) -> bool:
         """Add parent reaction to a message"""
         
-        if conversation_id not in self.conversations:
+        conv = self.store.get_conversation_info(conversation_id)
+        if conv is None:
             return False
         
-        conv = self.conversations[conversation_id]
-        
         # Verify parent has access
         if conv.get('parent_id') != parent_id:
             return False
         
-        # Find and update message
-        for msg in conv['messages']:
-            if msg['id'] == message_id:
-                msg['reactions'].append({
-                    'user_id': parent_id,
-                    'reaction': reaction,
-                    'timestamp': datetime.now().isoformat()
-                })
-                return True
-        
-        return False
+        return self.store.append_to_message(conversation_id, message_id, 'reactions', {
+            'user_id': parent_id,
+            'reaction': reaction,
+            'timestamp': datetime.now().isoformat()
+        })
     
     def add_curator_note(
         self,
@@ -120,29 +175,22 @@ class ConversationManager:
     ) -> bool:
         """Add curator note to a message"""
         
-        if conversation_id not in self.conversations:
+        conv = self.store.get_conversation_info(conversation_id)
+        if conv is None:
             return False
         
-        conv = self.conversations[conversation_id]
-        
         # Verify curator has access
         if curator_role == 'parent' and conv.get('parent_id') != curator_id:
             return False
         # Add teacher verification logic here
         
-        # Find and update message
-        for msg in conv['messages']:
-            if msg['id'] == message_id:
-                msg['curator_notes'].append({
-                    'curator_id': curator_id,
-                    'curator_role': curator_role,
-                    'note': note,
-                    'highlighted_text': highlighted_text,
-                    'timestamp': datetime.now().isoformat()
-                })
-                return True
-        
-        return False
+        return self.store.append_to_message(conversation_id, message_id, 'curator_notes', {
+            'curator_id': curator_id,
+            'curator_role': curator_role,
+            'note': note,
+            'highlighted_text': highlighted_text,
+            'timestamp': datetime.now().isoformat()
+        })
     
     def bookmark_message(
         self,
@@ -154,9 +202,6 @@ class ConversationManager:
     ) -> bool:
         """Bookmark a message"""
         
-        if conversation_id not in self.conversations:
-            return False
-        
         bookmark = {
             'message_id': message_id,
             'user_id': user_id,
@@ -165,8 +210,7 @@ class ConversationManager:
             'timestamp': datetime.now().isoformat()
         }
         
-        self.conversations[conversation_id]['bookmarks'].append(bookmark)
-        return True
+        return self.store.add_bookmark(conversation_id, bookmark)
     
     def flag_content(
         self,
@@ -190,21 +234,116 @@ class ConversationManager:
             'status': 'pending_review'
         }
         
-        self.flagged_content.append(flag)
+        conv = self.store.get_conversation_info(conversation_id)
+        is_child = conv is not None and conv['user_role'] == 'child'
+        self._tracked_write(
+            conv['parent_id'] if conv is not None else None,
+            lambda: self.store.add_flag(flag) or True,
+            lambda analytics: analytics.record_flag(flag)
+        )
         
-        if conversation_id in self.conversations:
-            self.conversations[conversation_id]['flags'].append(flag)
+        if is_child:
+            if conv['parent_id']:
+                self.change_feed.publish(conv['parent_id'], {
+                    'type': 'flag',
+                    'conversation_id': conversation_id,
+                    'child_id': conv['user_id'],
+                    'flag': flag
+                })
+            
+            # System flags mirror blocked messages, which add_message already reported
+            if flagger_role != 'system' and conv['parent_id']:
+                self.notifier.notify(conv['parent_id'], {
+                    'kind': 'flag',
+                    'severity': flag_severity(reason),
+                    'conversation_id': conversation_id,
+                    'child_id': conv['user_id'],
+                    'message_id': message_id,
+                    'summary': f"Flagged by {flagger_role}: {reason}",
+                    'timestamp': flag['timestamp']
+                })
         
         return True
     
-    def _notify_parent(self, parent_id: str, conversation_id: str, message: Dict):
-        """Notify parent of new child message (placeholder for real-time notification)"""
-        # In production, this would send real-time notification
-        # For prototype, we'll just log it
-        print(f"Parent notification: New message in child conversation {conversation_id}")
+    def _tracked_write(self, parent_id: Optional[str], write, update):
+        """
+        Run a store write and count it in the parent's aggregates exactly once. Until
+        the parent's aggregates are seeded the write runs under the analytics lock, so
+        a concurrent seed can't read it from the store and then also get the update.
+        Once seeded, writes run unlocked: any seed has already happened.
+        """
+        if parent_id is None:
+            return write()
+        if parent_id in self.analytics:
+            result = write()
+            if result:
+                self._update_analytics(parent_id, update)
+            return result
+        with self._analytics_lock:
+            result = write()
+            if result:
+                self._update_analytics(parent_id, update)
+            return result
+    
+    def _update_analytics(self, parent_id: str, update):
+        """
+        Apply an update to a parent's aggregates. The first time a parent is seen the
+        aggregates are seeded from the store, which already includes this change.
+        """
+        with self._analytics_lock:
+            analytics = self.analytics.get(parent_id)
+            if analytics is None:
+                self.analytics[parent_id] = self._seed_analytics(parent_id)
+            else:
+                update(analytics)
+    
+    def _seed_analytics(self, parent_id: str) -> ChildAnalytics:
+        """Build a parent's aggregates from stored history (e.g. after a restart)"""
+        analytics = ChildAnalytics()
+        flags = []
+        for conv in self.store.get_conversations_by_parent(parent_id):
+            analytics.record_conversation()
+            for msg in conv['messages']:
+                analytics.record_message(msg)
+            flags.extend(conv['flags'])
+        
+        for flag in sorted(flags, key=lambda f: f['timestamp']):
+            analytics.record_flag(flag)
+        return analytics
+    
+    def get_parent_analytics(self, parent_id: str) -> Dict:
+        """Analytics summary of every conversation linked to a parent"""
+        with self._analytics_lock:
+            if parent_id not in self.analytics:
+                self.analytics[parent_id] = self._seed_analytics(parent_id)
+            return summarize([self.analytics[parent_id]])
+    
+    def _notify_parent(self, parent_id: str, conversation_id: str, message: Dict, child_id: Optional[str] = None):
+        """
+        Queue a notification about a new message in a child's conversation. CRITICAL
+        messages are delivered right away; the rest are batched into digests.
+        """
+        metadata = message.get('metadata') or {}
+        if metadata.get('blocked'):
+            severity = metadata.get('severity') or blocked_severity(', '.join(metadata.get('safety_issues', [])))
+            summary = f"Blocked message: {', '.join(metadata.get('safety_issues', []))}"
+        else:
+            severity = 'INFO'
+            summary = f"New {message['role']} message"
+        
+        self.notifier.notify(parent_id, {
+            'kind': 'message',
+            'severity': severity,
+            'conversation_id': conversation_id,
+            'child_id': child_id,
+            'message_id': message['id'],
+            'summary': summary,
+            'timestamp': message['timestamp']
+        })
     
     def export_conversation(self, conversation_id: str) -> Optional[str]:
         """Export conversation as JSON"""
-        if conversation_id in self.conversations:
-            return json.dumps(self.conversations[conversation_id], indent=2)
+        conv = self.store.get_conversation(conversation_id)
+        if conv is not None:
+            return json.dumps(conv, indent=2)
         return None
\ No newline at end of file
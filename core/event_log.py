@@ -0,0 +1,399 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .metrics import metrics
+from .storage import MemoryConversationStore
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = 'snapshot.json'
+SEGMENT_PREFIX = 'events-'
+SEGMENT_SUFFIX = '.jsonl'
+
+# group: writers wait until their event is on disk; one fsync covers every
+#        event written while the previous fsync ran
+# interval: fsync every sync_interval seconds; writers never wait
+# none: flush every sync_interval seconds and leave syncing to the OS
+SYNC_MODES = ('group', 'interval', 'none')
+
+
+def _fsync_dir(path: str):
+    # Makes renames and new files durable; not supported on every platform
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class EventLog:
+    """
+    Append-only JSONL log split into segments named after their first sequence
+    number, plus one snapshot file. A background committer thread group-commits
+    appends; snapshot() starts a new segment so older ones can be deleted once
+    the snapshot that covers them is on disk.
+    """
+
+    def __init__(self, directory: str, sync: str = 'group', sync_interval: float = 1.0):
+        if sync not in SYNC_MODES:
+            raise ValueError(f"Unknown sync mode: {sync}")
+        self.directory = directory
+        self.sync = sync
+        self.sync_interval = sync_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._cond = threading.Condition(threading.Lock())
+        # Held by whoever fsyncs or swaps the segment file, taken before _cond
+        self._sync_lock = threading.Lock()
+        self._file = None
+        self._seq = 0
+        self._written = 0
+        self._durable = 0
+        self._failure = None
+        self._closed = False
+        self._committer = None
+        self.snapshot_seq = 0
+        self.counters = {'appended': 0, 'commits': 0, 'snapshots': 0, 'segments_removed': 0, 'torn_lines': 0}
+
+    # Reading
+
+    def _segments(self) -> List[Tuple[int, str]]:
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                first_seq = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+                segments.append((first_seq, os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    def load_snapshot(self) -> Optional[Dict]:
+        """The last snapshot's state, or None; sets snapshot_seq"""
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            snapshot = json.load(f)
+        self.snapshot_seq = self._seq = snapshot['seq']
+        return snapshot['state']
+
+    def replay(self) -> Iterator[Dict]:
+        """
+        Events after the snapshot, in order. A line cut short by a crash can only be
+        the last one of a segment; it was never acknowledged, so it is skipped. A bad
+        line anywhere else means a committed event is unreadable, so replay stops
+        with ValueError rather than silently dropping it.
+        """
+        for _, path in self._segments():
+            with open(path, encoding='utf-8') as f:
+                pending = None
+                for number, line in enumerate(f, 1):
+                    if pending is not None:
+                        yield from self._replay_line(path, *pending, last=False)
+                    pending = (number, line)
+                if pending is not None:
+                    yield from self._replay_line(path, *pending, last=True)
+
+    def _replay_line(self, path: str, number: int, line: str, last: bool) -> Iterator[Dict]:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            if last:
+                self.counters['torn_lines'] += 1
+                logger.warning("Skipping torn last line %d of %s", number, path)
+                return
+            raise ValueError(f"Corrupt event log: {path} line {number} is not valid JSON")
+        if event['seq'] <= self._seq:
+            return
+        self._seq = event['seq']
+        yield event
+
+    # Writing
+
+    def open(self):
+        """Start appending after the last replayed event, in a fresh segment"""
+        with self._cond:
+            self._written = self._durable = self._seq
+            self._file = self._open_segment(self._seq + 1)
+        self._committer = threading.Thread(target=self._commit_loop, name='event-log-commit', daemon=True)
+        self._committer.start()
+
+    def _open_segment(self, first_seq: int):
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{first_seq:012d}{SEGMENT_SUFFIX}")
+        segment = open(path, 'a', encoding='utf-8')
+        _fsync_dir(self.directory)
+        return segment
+
+    def append(self, event: Dict) -> int:
+        """
+        Write an event to the current segment and return its sequence number. The
+        event is serialized first, so one that can't be encoded raises before the
+        log changes; values JSON has no type for are stored as strings, as in the
+        SQLite store.
+        """
+        payload = json.dumps(event, separators=(',', ':'), default=str)
+        with self._cond:
+            if self._closed:
+                raise ValueError("Event log is closed")
+            self._seq += 1
+            self._file.write(f'{{"seq":{self._seq},{payload[1:]}\n')
+            self._written = self._seq
+            self.counters['appended'] += 1
+            if self.sync == 'group':
+                self._cond.notify_all()
+            return self._seq
+
+    def wait_durable(self, seq: int):
+        """Block until `seq` is on disk (group mode only; the other modes don't wait)"""
+        if self.sync != 'group':
+            return
+        with self._cond:
+            while self._durable < seq:
+                if self._failure is not None:
+                    raise OSError(f"Event log sync failed: {self._failure}")
+                self._cond.wait()
+
+    def _commit_loop(self):
+        while True:
+            with self._cond:
+                if self.sync == 'group':
+                    while self._written == self._durable and not self._closed:
+                        self._cond.wait()
+                elif not self._closed:
+                    self._cond.wait(self.sync_interval)
+                if self._closed or self._failure is not None:
+                    return
+            self._commit()
+
+    def _commit(self):
+        with self._sync_lock:
+            with self._cond:
+                target = self._written
+                if target == self._durable or self._file is None:
+                    return
+                self._file.flush()
+                fd = self._file.fileno()
+
+            started = time.perf_counter()
+            try:
+                if self.sync != 'none':
+                    os.fsync(fd)
+            except OSError as e:
+                logger.error("Event log fsync failed: %s", e)
+                with self._cond:
+                    self._failure = e
+                    self._cond.notify_all()
+                return
+            metrics.histogram('jurneego_event_log_fsync_seconds', 'Event log commit latency').observe(
+                time.perf_counter() - started
+            )
+
+            with self._cond:
+                self.counters['commits'] += 1
+                metrics.counter('jurneego_event_log_events_total', 'Events made durable').inc(target - self._durable)
+                self._durable = target
+                self._cond.notify_all()
+
+    def rotate(self) -> int:
+        """
+        Sync and close the current segment and start a new one. Returns the last
+        sequence number in the closed segment. Callers hold off appends meanwhile.
+        """
+        with self._sync_lock:
+            with self._cond:
+                if self._closed:
+                    raise ValueError("Event log is closed")
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._durable = self._written
+                self._file = self._open_segment(self._seq + 1)
+                self._cond.notify_all()
+                return self._seq
+
+    def write_snapshot(self, seq: int, state_json: str):
+        """Atomically replace the snapshot, then delete the segments it covers"""
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(f'{{"seq":{seq},"state":{state_json}}}')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_dir(self.directory)
+        self.snapshot_seq = seq
+        self.counters['snapshots'] += 1
+
+        # Every event in a segment that starts at or before seq is covered
+        for first_seq, segment_path in self._segments():
+            if first_seq <= seq:
+                os.remove(segment_path)
+                self.counters['segments_removed'] += 1
+
+    @property
+    def events_since_snapshot(self) -> int:
+        return self._seq - self.snapshot_seq
+
+    def close(self):
+        """Make everything written durable and stop the committer"""
+        with self._cond:
+            if self._closed or self._file is None:
+                self._closed = True
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._committer is not None:
+            self._committer.join()
+        with self._sync_lock:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            with self._cond:
+                if self._written != self._durable:
+                    self.counters['commits'] += 1
+                self._durable = self._written
+                self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        stats = dict(self.counters)
+        stats.update(seq=self._seq, durable_seq=self._durable, snapshot_seq=self.snapshot_seq,
+                     segments=len(self._segments()))
+        return stats
+
+
+class EventLogConversationStore(MemoryConversationStore):
+    """
+    In-memory store made durable by an EventLog: every mutation is logged as one
+    event and only then applied, and startup rebuilds the dicts from the latest
+    snapshot plus the events after it. Once `snapshot_every` events accumulate
+    a background thread snapshots the state and compacts the log; writers are
+    paused only while the state is serialized.
+    """
+
+    def __init__(self, directory: str, sync: str = 'group', sync_interval: float = 1.0,
+                 snapshot_every: int = 10000):
+        super().__init__()
+        self.log = EventLog(directory, sync=sync, sync_interval=sync_interval)
+        self.snapshot_every = snapshot_every
+        self._snapshotting = False
+        self._snapshot_thread = None
+        self._closing = False
+
+        started = time.perf_counter()
+        state = self.log.load_snapshot()
+        if state is not None:
+            for conversation in state['conversations'].values():
+                super().create_conversation(conversation)
+            self.flagged_content = state['flagged_content']
+        replayed = 0
+        for event in self.log.replay():
+            self._apply(event)
+            replayed += 1
+        self.log.open()
+        metrics.histogram('jurneego_event_log_replay_seconds', 'Time to rebuild conversations at startup').observe(
+            time.perf_counter() - started
+        )
+        if state is not None or replayed:
+            logger.info("Restored %d conversations from %s (%d events after snapshot)",
+                        len(self.conversations), directory, replayed)
+
+    def _apply(self, event: Dict):
+        op = event['op']
+        if op == 'create_conversation':
+            super().create_conversation(event['conversation'])
+        elif op == 'add_message':
+            super().add_message(event['conversation_id'], event['message'])
+        elif op == 'append_to_message':
+            super().append_to_message(event['conversation_id'], event['message_id'], event['field'], event['entry'])
+        elif op == 'add_bookmark':
+            super().add_bookmark(event['conversation_id'], event['bookmark'])
+        elif op == 'add_flag':
+            super().add_flag(event['flag'])
+        else:
+            logger.warning("Unknown event op '%s' skipped (seq %d)", op, event['seq'])
+
+    def _committed(self, seq: int):
+        # Called outside the store lock so concurrent writers share one fsync
+        self.log.wait_durable(seq)
+        if self.snapshot_every and self.log.events_since_snapshot >= self.snapshot_every:
+            with self._lock:
+                if self._snapshotting or self._closing:
+                    return
+                self._snapshotting = True
+                self._snapshot_thread = threading.Thread(target=self.snapshot, name='event-log-snapshot', daemon=True)
+                self._snapshot_thread.start()
+
+    # Each mutator checks that the change applies, logs it, and only then changes
+    # memory, so an event that fails to serialize or write leaves both untouched
+
+    def create_conversation(self, conversation: Dict):
+        with self._lock:
+            seq = self.log.append({'op': 'create_conversation', 'conversation': conversation})
+            super().create_conversation(conversation)
+        self._committed(seq)
+
+    def add_message(self, conversation_id: str, message: Dict) -> Optional[Dict]:
+        with self._lock:
+            if conversation_id not in self.conversations:
+                return None
+            seq = self.log.append({'op': 'add_message', 'conversation_id': conversation_id, 'message': message})
+            conv = super().add_message(conversation_id, message)
+        self._committed(seq)
+        return conv
+
+    def append_to_message(self, conversation_id: str, message_id: str, field: str, entry: Dict) -> bool:
+        with self._lock:
+            if message_id not in self.message_positions.get(conversation_id, ()):
+                return False
+            seq = self.log.append({'op': 'append_to_message', 'conversation_id': conversation_id,
+                                   'message_id': message_id, 'field': field, 'entry': entry})
+            super().append_to_message(conversation_id, message_id, field, entry)
+        self._committed(seq)
+        return True
+
+    def add_bookmark(self, conversation_id: str, bookmark: Dict) -> bool:
+        with self._lock:
+            if conversation_id not in self.conversations:
+                return False
+            seq = self.log.append({'op': 'add_bookmark', 'conversation_id': conversation_id, 'bookmark': bookmark})
+            super().add_bookmark(conversation_id, bookmark)
+        self._committed(seq)
+        return True
+
+    def add_flag(self, flag: Dict):
+        with self._lock:
+            seq = self.log.append({'op': 'add_flag', 'flag': flag})
+            super().add_flag(flag)
+        self._committed(seq)
+
+    def snapshot(self):
+        """Write the current state as a snapshot and drop the log segments it replaces"""
+        try:
+            with self._lock:
+                state_json = json.dumps({'conversations': self.conversations, 'flagged_content': self.flagged_content},
+                                        separators=(',', ':'), default=str)
+                seq = self.log.rotate()
+            with metrics.timer('jurneego_event_log_snapshot_seconds', 'Time to write a snapshot and compact'):
+                self.log.write_snapshot(seq, state_json)
+        except (OSError, ValueError) as e:
+            # ValueError: the log was closed under us
+            logger.error("Event log snapshot failed: %s", e)
+        finally:
+            with self._lock:
+                self._snapshotting = False
+
+    def close(self):
+        """Let a running snapshot finish, then make the log durable and stop it"""
+        with self._lock:
+            self._closing = True
+            snapshot_thread = self._snapshot_thread
+        if snapshot_thread is not None and snapshot_thread is not threading.current_thread():
+            snapshot_thread.join()
+        self.log.close()
@@ -1,8 +1,68 @@
 import re
-from typing import Tuple, List, Dict, Optional
+import os
+import json
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Tuple, List, Dict, Optional, Sequence
 from datetime import datetime
 import hashlib
-from .constants import BLOCKED_TOPICS, SAFE_REDIRECTS, AGE_SETTINGS
+from .constants import (
+    BLOCKED_TOPICS, SAFE_REDIRECTS, AGE_SETTINGS,
+    CODED_TERMS, ESCALATION_INDICATORS, SEVERITY_KEYWORDS
+)
+from .keyword_matcher import KeywordMatch, KeywordMatcher
+from .metrics import metrics, stage_timer
+
+# Per-process guardrails used by batch scanning workers
+_worker_guardrails = None
+
+
+def _scan_batch_chunk(messages: List[str]) -> List[Tuple[List[str], List[str]]]:
+    """Scan a chunk of messages inside a process pool worker"""
+    global _worker_guardrails
+    if _worker_guardrails is None:
+        _worker_guardrails = COPPAGuardrails()
+    return [_worker_guardrails._scan_message(message) for message in messages]
+
+
+class UserContext:
+    """Recent messages and detected patterns for one user, in fixed-size ring buffers"""
+
+    __slots__ = ('risk_score', 'patterns', 'last_messages', 'escalation_detected', 'last_seen')
+
+    def __init__(self, max_messages: int = 10, max_patterns: int = 50):
+        self.risk_score = 0
+        self.patterns = deque(maxlen=max_patterns)
+        self.last_messages = deque(maxlen=max_messages)
+        self.escalation_detected = False
+        self.last_seen = time.time()
+
+    def recent_messages(self, count: int) -> List[str]:
+        """The last `count` messages, oldest first"""
+        return list(islice(reversed(self.last_messages), count))[::-1]
+
+    def to_dict(self) -> Dict:
+        return {
+            'risk_score': self.risk_score,
+            'patterns': list(self.patterns),
+            'last_messages': list(self.last_messages),
+            'escalation_detected': self.escalation_detected,
+            'last_seen': self.last_seen
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, max_messages: int = 10, max_patterns: int = 50) -> 'UserContext':
+        context = cls(max_messages, max_patterns)
+        context.risk_score = data.get('risk_score', 0)
+        context.patterns.extend(data.get('patterns', []))
+        context.last_messages.extend(data.get('last_messages', []))
+        context.escalation_detected = data.get('escalation_detected', False)
+        context.last_seen = data.get('last_seen', context.last_seen)
+        return context
+
 
 class COPPAGuardrails:
     """COPPA compliance and child safety guardrails with advanced detection"""
@@ -20,108 +80,48 @@ class COPPAGuardrails:
         self.blocked_topics = BLOCKED_TOPICS
         self.safe_redirects = SAFE_REDIRECTS
         
-        # Context history for pattern detection
-        self.conversation_context = {}
-        
-        # Severity levels
-        self.severity_levels = {
-            'CRITICAL': ['suicide', 'self-harm', 'kill myself', 'end my life', 'throw myself'],
-            'HIGH': ['drugs', 'weapons', 'violence', 'abuse'],
-            'MEDIUM': ['alcohol', 'inappropriate content', 'adult content'],
-            'LOW': ['dating', 'romance', 'mild language']
-        }
-    
-    def analyze_message_context(self, user_id: str, message: str, conversation_history: Optional[List[Dict]] = None) -> Dict:
-        """Analyze message in context of conversation history"""
-        
-        # Initialize user context if not exists
-        if user_id not in self.conversation_context:
-            self.conversation_context[user_id] = {
-                'risk_score': 0,
-                'patterns': [],
-                'last_messages': [],
-                'escalation_detected': False
-            }
+        # Context history for pattern detection, least recently active user first.
+        # Users idle past GUARDRAILS_CONTEXT_IDLE seconds, or beyond
+        # GUARDRAILS_MAX_USERS, are dropped
+        self.conversation_context = OrderedDict()
+        self._context_lock = threading.RLock()
+        self.max_context_users = int(os.getenv('GUARDRAILS_MAX_USERS', '10000'))
+        self.context_idle_seconds = float(os.getenv('GUARDRAILS_CONTEXT_IDLE', '86400'))
         
-        context = self.conversation_context[user_id]
-        context['last_messages'].append(message)
+        # LRU of content rule hits keyed by a digest of the normalized message
+        # (GUARDRAILS_SCAN_CACHE_SIZE=0 disables it). PII is always scanned on the raw
+        # message and escalation tracking never uses it
+        self.scan_cache_size = int(os.getenv('GUARDRAILS_SCAN_CACHE_SIZE', '4096'))
+        self._scan_cache = OrderedDict()
+        self._scan_cache_lock = threading.Lock()
+        self.scan_cache_counters = {'hits': 0, 'misses': 0, 'evictions': 0}
         
-        # Keep only last 10 messages for context
-        if len(context['last_messages']) > 10:
-            context['last_messages'] = context['last_messages'][-10:]
+        # Optional JSON file so escalation state survives restarts; saved from a
+        # background thread, one save at a time
+        self.context_path = os.getenv('GUARDRAILS_CONTEXT_PATH')
+        self.context_save_interval = float(os.getenv('GUARDRAILS_CONTEXT_SAVE_INTERVAL', '30'))
+        self._context_saved_at = time.monotonic()
+        self._save_lock = threading.Lock()
+        if self.context_path:
+            self.load_context()
         
-        # Pattern detection
-        patterns_detected = []
-        
-        # Escalation patterns (getting worse over time)
-        if len(context['last_messages']) >= 3:
-            messages_text = ' '.join(context['last_messages'][-3:]).lower()
-            
-            # Check for escalating self-harm language
-            escalation_indicators = [
-                ('thinking about', 'planning to', 'going to'),
-                ('sad', 'depressed', 'want to die'),
-                ('maybe', 'probably', 'definitely')
-            ]
-            
-            for pattern_sequence in escalation_indicators:
-                matches = sum(1 for phrase in pattern_sequence if phrase in messages_text)
-                if matches >= 2:
-                    patterns_detected.append('escalation')
-                    context['escalation_detected'] = True
-        
-        # Coded language detection
-        coded_terms = {
-            'unalive': 'self-harm',
-            'sewerslide': 'suicide',
-            'su1c1de': 'suicide',
-            '3d': 'eating disorder',
-            'sn0w': 'drugs',
-            'gr@ss': 'drugs',
-            'p1lls': 'drugs'
-        }
-        
-        message_lower = message.lower()
-        for code, actual in coded_terms.items():
-            if code in message_lower:
-                patterns_detected.append(f'coded_language:{actual}')
-        
-        # Update context
-        context['patterns'].extend(patterns_detected)
-        
-        return {
-            'patterns': patterns_detected,
-            'risk_score': context['risk_score'],
-            'escalation_detected': context['escalation_detected'],
-            'context_summary': context
-        }
-    
-    def check_message_safety(self, message: str, user_age: int, user_id: Optional[str] = None) -> Tuple[bool, List[str], str, str]:
-        """
-        Enhanced safety check with context and severity
-        Returns: (is_safe, issues_found, suggested_redirect, severity)
-        """
-        issues = []
-        suggested_redirect = ""
-        severity = "LOW"
-        message_lower = message.lower()
-        
-        # Context analysis if user_id provided
-        context_analysis = {}
-        if user_id:
-            context_analysis = self.analyze_message_context(user_id, message)
-            if context_analysis['escalation_detected']:
-                issues.append("Escalating concerning behavior detected")
-                severity = "CRITICAL"
-        
-        # Check for PII
-        for pii_type, pattern in self.pii_patterns.items():
-            if re.search(pattern, message, re.IGNORECASE):
-                issues.append(f"Personal information detected: {pii_type}")
-                severity = max(severity, "MEDIUM")
+        # Severity levels
+        self.severity_levels = SEVERITY_KEYWORDS
         
+        # Literal terms (coded language, escalation phrases, severity keywords)
+        # share one keyword automaton so each text is scanned once
+        self.coded_terms = CODED_TERMS
+        self.escalation_indicators = ESCALATION_INDICATORS
+        self._coded_order = {code: index for index, code in enumerate(self.coded_terms)}
+        self._keyword_matcher = KeywordMatcher()
+        self._keyword_matcher.add_terms(self.coded_terms, 'coded')
+        for index, pattern_sequence in enumerate(self.escalation_indicators):
+            self._keyword_matcher.add_terms(pattern_sequence, f'escalation:{index}')
+        for level, terms in self.severity_levels.items():
+            self._keyword_matcher.add_terms(terms, f'severity:{level}')
+
         # Advanced harmful content detection with nuanced patterns
-        harm_patterns = {
+        self.harm_patterns = {
             'self-harm': {
                 'patterns': [
                     r'\b(kill|hurt|harm|cut|end)\s*(my|)self\b',
@@ -170,42 +170,281 @@ class COPPAGuardrails:
             }
         }
         
-        # Check each category
-        for category, config in harm_patterns.items():
-            for pattern in config['patterns']:
-                if re.search(pattern, message_lower):
-                    issues.append(f"Concerning content: {category}")
-                    severity = config['severity']
-                    suggested_redirect = config['redirect']
-                    break
-        
-        # Age-specific content
-        if user_age < 13:
-            youth_inappropriate = [
-                r'\b(dating|boyfriend|girlfriend|romance|kiss)\b',
-                r'\b(beer|alcohol|drunk|wine|vodka)\b',
-                r'\b(vape|vaping|cigarette|smoking)\b'
-            ]
-            
-            for pattern in youth_inappropriate:
-                if re.search(pattern, message_lower):
-                    issues.append("Age-inappropriate topic")
-                    severity = max(severity, "MEDIUM")
-                    suggested_redirect = "That's a topic for when you're older. Right now, let's focus on fun things kids your age enjoy! What games do you like to play or what are you learning about in school?"
-                    break
+        # Age-specific content (applied to users under 13)
+        self.youth_inappropriate = [
+            r'\b(dating|boyfriend|girlfriend|romance|kiss)\b',
+            r'\b(beer|alcohol|drunk|wine|vodka)\b',
+            r'\b(vape|vaping|cigarette|smoking)\b'
+        ]
         
-        # Check for concerning question patterns that might be testing boundaries
-        boundary_testing = [
+        # Concerning question patterns that might be testing boundaries
+        self.boundary_testing = [
             r'what\s*if\s*i\s*(told|said)\s*you',
             r'would\s*you\s*(tell|report|snitch)',
             r'can\s*you\s*keep\s*a\s*secret',
             r'don\'t\s*tell\s*(my|anyone)'
         ]
         
-        for pattern in boundary_testing:
-            if re.search(pattern, message_lower):
+        # Compile every rule once: PII is matched case-insensitively against the raw
+        # message, everything else against the lowered message. Each content rule's
+        # patterns are joined into one alternation, so a rule costs a single search
+        self._compiled_pii = {
+            pii_type: re.compile(pattern, re.IGNORECASE)
+            for pii_type, pattern in self.pii_patterns.items()
+        }
+        content_rules = [(category, config['patterns']) for category, config in self.harm_patterns.items()]
+        content_rules.append(('age_inappropriate', self.youth_inappropriate))
+        content_rules.append(('boundary_testing', self.boundary_testing))
+        self._content_rules = [
+            (name, re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)))
+            for name, patterns in content_rules
+        ]
+    
+    def _scan_message(self, message: str) -> Tuple[List[str], List[str]]:
+        """Return (pii types, content rules) matched by the message, in rule order"""
+        return self._scan_pii(message), self._scan_content(message.lower())
+    
+    def _scan_pii(self, message: str) -> List[str]:
+        # Lowering can change what PII matches ('İ' becomes 'i' plus a combining dot,
+        # which \w doesn't match), so PII always sees the raw message
+        return [pii_type for pii_type, pattern in self._compiled_pii.items() if pattern.search(message)]
+    
+    def _scan_content(self, message_lower: str) -> List[str]:
+        return [name for name, pattern in self._content_rules if pattern.search(message_lower)]
+    
+    @staticmethod
+    def _scan_key(message: str) -> Tuple[str, bytes]:
+        """Normalized message and its cache key; content rules don't depend on case or outer whitespace"""
+        normalized = message.strip().lower()
+        return normalized, hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+    
+    def _scan_cache_get(self, key: bytes) -> Optional[List[str]]:
+        with self._scan_cache_lock:
+            scan = self._scan_cache.get(key)
+            if scan is None:
+                self.scan_cache_counters['misses'] += 1
+            else:
+                self._scan_cache.move_to_end(key)
+                self.scan_cache_counters['hits'] += 1
+        metrics.counter('jurneego_scan_cache_total', 'Guardrail scan cache lookups').inc(
+            result='miss' if scan is None else 'hit'
+        )
+        return scan
+    
+    def _scan_cache_put(self, key: bytes, scan: List[str]):
+        if self.scan_cache_size <= 0:
+            return
+        with self._scan_cache_lock:
+            self._scan_cache[key] = scan
+            self._scan_cache.move_to_end(key)
+            while len(self._scan_cache) > self.scan_cache_size:
+                self._scan_cache.popitem(last=False)
+                self.scan_cache_counters['evictions'] += 1
+    
+    def _cached_scan(self, message: str) -> Tuple[List[str], List[str]]:
+        """_scan_message with the content rule hits served from the LRU cache"""
+        if self.scan_cache_size <= 0:
+            return self._scan_message(message)
+        normalized, key = self._scan_key(message)
+        content_hits = self._scan_cache_get(key)
+        if content_hits is None:
+            content_hits = self._scan_content(normalized)
+            self._scan_cache_put(key, content_hits)
+        return self._scan_pii(message), content_hits
+    
+    def get_scan_cache_stats(self) -> Dict:
+        """Scan cache counters and hit ratio, for sizing GUARDRAILS_SCAN_CACHE_SIZE"""
+        with self._scan_cache_lock:
+            stats = dict(self.scan_cache_counters)
+            stats['entries'] = len(self._scan_cache)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+    
+    def analyze_message_context(self, user_id: str, message: str, conversation_history: Optional[List[Dict]] = None) -> Dict:
+        """Analyze message in context of conversation history"""
+        
+        with self._context_lock:
+            context = self._user_context(user_id)
+            context.last_messages.append(message)
+            recent = context.recent_messages(3)
+        
+        # Pattern detection
+        patterns_detected = []
+        
+        # Escalation patterns (getting worse over time)
+        if len(recent) >= 3:
+            messages_text = ' '.join(recent).lower()
+            found = self._keyword_matcher.find_terms(messages_text)
+            
+            # Check for escalating self-harm language
+            for index in range(len(self.escalation_indicators)):
+                if len(found.get(f'escalation:{index}', ())) >= 2:
+                    patterns_detected.append('escalation')
+        
+        
+        # Coded language detection
+        coded_hits = self._keyword_matcher.find_terms(message.lower()).get('coded', ())
+        for code in sorted(coded_hits, key=self._coded_order.get):
+            patterns_detected.append(f'coded_language:{self.coded_terms[code]}')
+        
+        # Update context
+        with self._context_lock:
+            if 'escalation' in patterns_detected:
+                context.escalation_detected = True
+            context.patterns.extend(patterns_detected)
+            summary = context.to_dict()
+        self._maybe_save_context()
+        
+        return {
+            'patterns': patterns_detected,
+            'risk_score': summary['risk_score'],
+            'escalation_detected': summary['escalation_detected'],
+            'context_summary': summary
+        }
+    
+    def _user_context(self, user_id: str) -> UserContext:
+        """The user's context (created if needed) marked as most recently active"""
+        now = time.time()
+        context = self.conversation_context.get(user_id)
+        if context is None:
+            context = UserContext()
+            self.conversation_context[user_id] = context
+        else:
+            self.conversation_context.move_to_end(user_id)
+        context.last_seen = now
+        self._evict_idle_contexts(now)
+        return context
+    
+    def _evict_idle_contexts(self, now: float):
+        # Oldest activity is at the front, so stop at the first active user
+        while self.conversation_context:
+            user_id, context = next(iter(self.conversation_context.items()))
+            too_many = len(self.conversation_context) > self.max_context_users
+            idle = self.context_idle_seconds > 0 and now - context.last_seen > self.context_idle_seconds
+            if not (too_many or idle):
+                break
+            del self.conversation_context[user_id]
+    
+    def save_context(self, path: Optional[str] = None):
+        """Write all user contexts to a JSON file (atomically replaced)"""
+        path = path or self.context_path
+        if not path:
+            return
+        with self._save_lock:
+            with self._context_lock:
+                self._context_saved_at = time.monotonic()
+                data = {user_id: context.to_dict() for user_id, context in self.conversation_context.items()}
+            
+            # Unique temp file in the same directory, so the rename stays atomic
+            fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp',
+                                            dir=os.path.dirname(os.path.abspath(path)))
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+    
+    def load_context(self, path: Optional[str] = None):
+        """Restore user contexts saved by save_context, skipping users idle too long"""
+        path = path or self.context_path
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load guardrails context from {path}: {e}")
+            return
+        
+        with self._context_lock:
+            for user_id, saved in sorted(data.items(), key=lambda item: item[1].get('last_seen', 0)):
+                self.conversation_context[user_id] = UserContext.from_dict(saved)
+                self.conversation_context.move_to_end(user_id)
+            self._evict_idle_contexts(time.time())
+    
+    def _maybe_save_context(self):
+        """Start a background save when the interval has passed; never blocks the chat turn"""
+        if not self.context_path:
+            return
+        with self._context_lock:
+            now = time.monotonic()
+            if now - self._context_saved_at < self.context_save_interval:
+                return
+            # Claimed here so only one turn starts the save
+            self._context_saved_at = now
+        threading.Thread(target=self._save_context_quietly, name='guardrails-context-save', daemon=True).start()
+    
+    def _save_context_quietly(self):
+        try:
+            self.save_context()
+        except OSError as e:
+            print(f"Could not save guardrails context: {e}")
+    
+    def find_keywords(self, text: str) -> List[KeywordMatch]:
+        """Report every literal guardrail term in the text with its category and offset"""
+        return self._keyword_matcher.find_all(text.lower())
+    
+    def check_message_safety(self, message: str, user_age: int, user_id: Optional[str] = None) -> Tuple[bool, List[str], str, str]:
+        """
+        Enhanced safety check with context and severity
+        Returns: (is_safe, issues_found, suggested_redirect, severity)
+        """
+        with stage_timer('safety_check'):
+            result = self._check_message_safety(message, user_age, user_id)
+        if not result[0]:
+            metrics.counter('jurneego_blocked_messages_total', 'Messages blocked by guardrails').inc(severity=result[3])
+        return result
+    
+    def _check_message_safety(self, message: str, user_age: int, user_id: Optional[str]) -> Tuple[bool, List[str], str, str]:
+        issues = []
+        severity = "LOW"
+        
+        # Context analysis if user_id provided
+        context_analysis = {}
+        if user_id:
+            context_analysis = self.analyze_message_context(user_id, message)
+            if context_analysis['escalation_detected']:
+                issues.append("Escalating concerning behavior detected")
+                severity = "CRITICAL"
+        
+        # Context analysis above always runs; only the stateless scan is cached
+        return self._evaluate_scan(self._cached_scan(message), user_age, issues, severity)
+    
+    def _evaluate_scan(
+        self,
+        scan: Tuple[List[str], List[str]],
+        user_age: int,
+        issues: List[str],
+        severity: str
+    ) -> Tuple[bool, List[str], str, str]:
+        """Turn scanner hits into the (is_safe, issues, redirect, severity) result"""
+        pii_hits, content_hits = scan
+        suggested_redirect = ""
+        
+        # Check for PII
+        for pii_type in pii_hits:
+            issues.append(f"Personal information detected: {pii_type}")
+            severity = max(severity, "MEDIUM")
+        
+        for category in content_hits:
+            if category == 'age_inappropriate':
+                # Age-specific content
+                if user_age < 13:
+                    issues.append("Age-inappropriate topic")
+                    severity = max(severity, "MEDIUM")
+                    suggested_redirect = "That's a topic for when you're older. Right now, let's focus on fun things kids your age enjoy! What games do you like to play or what are you learning about in school?"
+            elif category == 'boundary_testing':
                 issues.append("Boundary testing detected")
                 severity = max(severity, "MEDIUM")
+            else:
+                config = self.harm_patterns[category]
+                issues.append(f"Concerning content: {category}")
+                severity = config['severity']
+                suggested_redirect = config['redirect']
         
         # Remove duplicates
         issues = list(set(issues))
@@ -223,16 +462,102 @@ class COPPAGuardrails:
         is_safe = len(issues) == 0
         return is_safe, issues, suggested_redirect, severity
     
+    def check_messages_batch(
+        self,
+        messages: Sequence[str],
+        ages: Sequence[int],
+        user_ids: Optional[Sequence[Optional[str]]] = None,
+        workers: int = 0,
+        chunk_size: int = 1000
+    ) -> Dict[str, List]:
+        """
+        Classify many messages in one call, e.g. to re-moderate stored conversations
+        after a rule change. Results are columnar: each key holds one entry per message,
+        matching what check_message_safety would return for it.
+        
+        Each distinct message is scanned once. Stateless scanning fans out over a process
+        pool when workers > 1 and there is more than one chunk of distinct messages;
+        workers use the default rule set. Context analysis for user_ids always runs in
+        this process, in message order.
+        """
+        if len(ages) != len(messages):
+            raise ValueError("ages must have one entry per message")
+        if user_ids is not None and len(user_ids) != len(messages):
+            raise ValueError("user_ids must have one entry per message")
+        
+        # Each distinct message is scanned once and duplicates share the result
+        distinct = list(dict.fromkeys(messages))
+        if workers > 1 and len(distinct) > chunk_size:
+            # multiprocessing is slow to import and only needed for large batches
+            from concurrent.futures import ProcessPoolExecutor
+            
+            # Only cache misses go to the pool, one message per cache key
+            keys = {}
+            content = {}
+            missing = {}
+            for message in distinct:
+                _, key = self._scan_key(message)
+                keys[message] = key
+                if key in content or key in missing:
+                    continue
+                content_hits = self._scan_cache_get(key)
+                if content_hits is None:
+                    missing[key] = message
+                else:
+                    content[key] = content_hits
+            
+            pending = list(missing.items())
+            chunks = [[message for _, message in pending[i:i + chunk_size]] for i in range(0, len(pending), chunk_size)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                fresh = [scan for chunk_scans in executor.map(_scan_batch_chunk, chunks) for scan in chunk_scans]
+            found = {}
+            for (key, message), scan in zip(pending, fresh):
+                found[message] = scan
+                content[key] = scan[1]
+                self._scan_cache_put(key, scan[1])
+            # Everything else still needs its own PII scan
+            for message in distinct:
+                if message not in found:
+                    found[message] = (self._scan_pii(message), content[keys[message]])
+        else:
+            found = {message: self._cached_scan(message) for message in distinct}
+        scans = [found[message] for message in messages]
+        
+        results = {'is_safe': [], 'issues': [], 'redirect': [], 'severity': []}
+        for index, scan in enumerate(scans):
+            issues = []
+            severity = "LOW"
+            
+            user_id = user_ids[index] if user_ids is not None else None
+            if user_id:
+                context_analysis = self.analyze_message_context(user_id, messages[index])
+                if context_analysis['escalation_detected']:
+                    issues.append("Escalating concerning behavior detected")
+                    severity = "CRITICAL"
+            
+            is_safe, issues, redirect, severity = self._evaluate_scan(scan, ages[index], issues, severity)
+            results['is_safe'].append(is_safe)
+            results['issues'].append(issues)
+            results['redirect'].append(redirect)
+            results['severity'].append(severity)
+        
+        return results
+    
     def sanitize_response(self, response: str) -> str:
         """Remove any PII or inappropriate content from AI responses"""
-        sanitized = response
-        
-        # Remove any detected PII patterns
-        for pii_type, pattern in self.pii_patterns.items():
-            sanitized = re.sub(pattern, f'[{pii_type.upper()}_REMOVED]', sanitized, flags=re.IGNORECASE)
+        with stage_timer('sanitize'):
+            sanitized = response
+            
+            # Remove any detected PII patterns
+            for pii_type, pattern in self._compiled_pii.items():
+                sanitized = pattern.sub(f'[{pii_type.upper()}_REMOVED]', sanitized)
         
         return sanitized
     
+    def stream_sanitizer(self, holdback: int = 80) -> 'StreamingSanitizer':
+        """Create a sanitizer for a response that arrives in chunks"""
+        return StreamingSanitizer(self, holdback)
+    
     def log_safety_check(self, user_id: str, message: str, issues: List[str], severity: str = "LOW") -> Dict:
         """Enhanced safety logging with severity"""
         return {
@@ -279,4 +604,54 @@ class COPPAGuardrails:
         elif age < AGE_SETTINGS['middle_school']['max_age']:
             return AGE_SETTINGS['middle_school']
         else:
-            return AGE_SETTINGS['high_school']
\ No newline at end of file
+            return AGE_SETTINGS['high_school']
+
+
+class StreamingSanitizer:
+    """
+    Apply sanitize_response to streamed text without splitting PII across chunks.
+    The last `holdback` characters stay buffered, and text is only released up to a
+    whitespace boundary that no PII match crosses, so any PII shorter than the
+    holdback window is sanitized as a whole.
+    """
+    
+    def __init__(self, guardrails: COPPAGuardrails, holdback: int = 80):
+        self.guardrails = guardrails
+        self.holdback = holdback
+        self._buffer = ""
+    
+    def feed(self, chunk: str) -> str:
+        """Add a chunk and return the sanitized text that is now safe to display"""
+        self._buffer += chunk
+        cut = self._safe_cut()
+        if cut <= 0:
+            return ""
+        
+        released, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self.guardrails.sanitize_response(released)
+    
+    def flush(self) -> str:
+        """Sanitize and return whatever is still buffered at the end of the stream"""
+        released, self._buffer = self._buffer, ""
+        return self.guardrails.sanitize_response(released) if released else ""
+    
+    def _safe_cut(self) -> int:
+        """Find the end of the releasable prefix of the buffer"""
+        cut = len(self._buffer) - self.holdback
+        
+        while cut > 0:
+            # Only release up to whitespace so word boundaries are unaffected
+            while cut > 0 and not self._buffer[cut - 1].isspace():
+                cut -= 1
+            
+            crossing = [
+                match.start()
+                for pattern in self.guardrails._compiled_pii.values()
+                for match in pattern.finditer(self._buffer)
+                if match.start() < cut < match.end()
+            ]
+            if not crossing:
+                break
+            cut = min(crossing)
+        
+        return cut
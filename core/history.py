@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return max(1, (len(text) + 3) // 4)
+
+
+class HistoryAssembler:
+    """
+    Build the Bedrock `messages` array for a turn from stored conversation messages.
+    Recent turns are kept verbatim while they fit in the token budget; older turns
+    are folded into a short rolling summary of the child's earlier questions, which
+    is cached per conversation and only extended as turns leave the window. Callers
+    may pass just the latest stored messages: the summary remembers the newest
+    message id it has folded in, so topics from before that tail are kept. The
+    cache holds the `max_conversations` most recently used conversations.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        summary_budget: int = 200,
+        snippet_chars: int = 80,
+        max_conversations: int = 1024
+    ):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.snippet_chars = snippet_chars
+        self.max_conversations = max_conversations
+        # conversation_id -> {'last_id': str, 'topics': List[str]}, least recently used first
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _turns(self, stored_messages: List[Dict]) -> List[Dict]:
+        """Keep user/assistant turns, dropping blocked questions and the reply to them"""
+        turns = []
+        skip_reply = False
+        for msg in stored_messages:
+            if msg['role'] == 'user':
+                skip_reply = bool(msg.get('metadata', {}).get('blocked'))
+                if not skip_reply:
+                    turns.append({'id': msg.get('id', ''), 'role': 'user', 'content': msg['content']})
+            elif msg['role'] == 'assistant':
+                if not skip_reply:
+                    turns.append({'id': msg.get('id', ''), 'role': 'assistant', 'content': msg['content']})
+                skip_reply = False
+        return turns
+
+    def _summary(self, conversation_id: Optional[str], older_turns: List[Dict]) -> str:
+        """Rolling summary of turns that no longer fit, reusing the cached part"""
+        if not older_turns:
+            return ""
+
+        with self._lock:
+            cached = self._summaries.get(conversation_id) if conversation_id else None
+            if cached is None:
+                cached = {'last_id': '', 'topics': []}
+
+            # Message ids are time-sortable, so anything newer hasn't been folded in yet
+            for turn in older_turns:
+                if turn['id'] and turn['id'] <= cached['last_id']:
+                    continue
+                if turn['role'] == 'user':
+                    snippet = ' '.join(turn['content'].split())
+                    if len(snippet) > self.snippet_chars:
+                        snippet = snippet[:self.snippet_chars].rsplit(' ', 1)[0] + '...'
+                    cached['topics'].append(snippet)
+            cached['last_id'] = max(cached['last_id'], older_turns[-1]['id'])
+
+            # Keep the most recent topics that fit in the summary budget
+            topics, used = [], 0
+            for topic in reversed(cached['topics']):
+                used += estimate_tokens(topic) + 1
+                if used > self.summary_budget:
+                    break
+                topics.append(topic)
+            cached['topics'] = cached['topics'][-len(topics):] if topics else []
+
+            if conversation_id:
+                self._summaries[conversation_id] = cached
+                self._summaries.move_to_end(conversation_id)
+                while len(self._summaries) > self.max_conversations:
+                    self._summaries.popitem(last=False)
+
+        return "Earlier in this conversation the child asked about: " + '; '.join(reversed(topics))
+
+    def build_messages(self, stored_messages: List[Dict], prompt: str, conversation_id: Optional[str] = None) -> List[Dict]:
+        """Return alternating user/assistant messages ending with the current prompt"""
+        turns = self._turns(stored_messages)
+
+        # Walk back from the newest turn while it fits in what's left of the budget
+        remaining = self.token_budget - estimate_tokens(prompt) - self.summary_budget
+        start = len(turns)
+        while start > 0 and estimate_tokens(turns[start - 1]['content']) <= remaining:
+            remaining -= estimate_tokens(turns[start - 1]['content'])
+            start -= 1
+
+        # Bedrock requires the conversation to start with a user turn
+        while start < len(turns) and turns[start]['role'] != 'user':
+            start += 1
+
+        messages = []
+        for turn in turns[start:] + [{'role': 'user', 'content': prompt}]:
+            if messages and messages[-1]['role'] == turn['role']:
+                messages[-1]['content'] += "\n\n" + turn['content']
+            else:
+                messages.append({'role': turn['role'], 'content': turn['content']})
+
+        summary = self._summary(conversation_id, turns[:start])
+        if summary:
+            messages[0]['content'] = f"{summary}\n\n{messages[0]['content']}"
+
+        return messages
+
+    def forget(self, conversation_id: str):
+        """Drop the cached summary for a conversation"""
+        with self._lock:
+            self._summaries.pop(conversation_id, None)
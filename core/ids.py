@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+# Crockford base32, which keeps encoded ids in the same order as their values
+_ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+_lock = threading.Lock()
+_last_ms = 0
+_last_random = 0
+
+
+def _reset_after_fork():
+    """A forked child must not continue the parent's sequence"""
+    global _lock, _last_ms, _last_random
+    _lock = threading.Lock()
+    _last_ms = 0
+    _last_random = 0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _encode(value: int) -> str:
+    chars = []
+    for _ in range(26):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return ''.join(reversed(chars))
+
+
+def new_ulid() -> str:
+    """
+    26-character ULID: 48-bit millisecond timestamp then 80 random bits.
+    Ids from one process are strictly increasing, even within the same
+    millisecond or if the clock steps back; processes don't collide because
+    each millisecond starts from fresh OS randomness.
+    """
+    global _last_ms, _last_random
+    with _lock:
+        now_ms = int(time.time() * 1000)
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            _last_random = int.from_bytes(os.urandom(10), 'big')
+        elif _last_random < _RANDOM_MAX:
+            _last_random += 1
+        else:
+            _last_ms += 1
+            _last_random = int.from_bytes(os.urandom(10), 'big')
+        value = (_last_ms << _RANDOM_BITS) | _last_random
+    return _encode(value)
+
+
+def new_id(prefix: str) -> str:
+    """Prefixed, time-sortable id such as msg_01J9Z3..."""
+    return f"{prefix}_{new_ulid()}"
+
+
+def _decode_time(ulid: str) -> int:
+    value = 0
+    for char in ulid[:10]:
+        value = value * 32 + _ALPHABET.index(char)
+    return value
+
+
+def id_timestamp(identifier: str) -> datetime:
+    """Creation time encoded in a ULID or prefixed id"""
+    ulid = identifier.rsplit('_', 1)[-1] if '_' in identifier else identifier
+    return datetime.fromtimestamp(_decode_time(ulid) / 1000, tz=timezone.utc)
+
+
+def id_floor(prefix: str, moment: datetime) -> str:
+    """Smallest id with this prefix created at `moment`, for range scans by time"""
+    return f"{prefix}_{_encode(int(moment.timestamp() * 1000) << _RANDOM_BITS)}"
@@ -0,0 +1,113 @@
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+class KeywordMatch(NamedTuple):
+    term: str
+    category: str
+    offset: int
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton for literal term matching.
+    Finds every occurrence of every term in a single pass over the text,
+    independent of how many terms are loaded. Matching is exact, so callers
+    lower-case both terms and text when they want case-insensitive hits.
+    The automaton is built as soon as terms are added, so shared matchers
+    are read-only while matching; load every term before sharing one.
+    """
+
+    def __init__(self, terms: Optional[Dict[str, Iterable[str]]] = None):
+        # State 0 is the root; outputs hold (term, category) pairs ending at a state
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        self._built = True
+        self._lock = threading.RLock()
+
+        if terms:
+            with self._lock:
+                for category, category_terms in terms.items():
+                    for term in category_terms:
+                        self.add(term, category)
+                self._build()
+
+    def add(self, term: str, category: str):
+        """Add a literal term reported under the given category"""
+        if not term:
+            raise ValueError("Keyword terms must be non-empty")
+
+        with self._lock:
+            state = 0
+            for char in term:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append([])
+                    self._goto[state][char] = next_state
+                state = next_state
+
+            if (term, category) not in self._outputs[state]:
+                self._outputs[state].append((term, category))
+            self._built = False
+
+    def add_terms(self, terms: Iterable[str], category: str):
+        """Add several terms under one category and rebuild the automaton"""
+        with self._lock:
+            for term in terms:
+                self.add(term, category)
+            self._build()
+
+    def _build(self):
+        """Compute failure links breadth-first and merge inherited outputs (caller holds the lock)"""
+        queue = deque()
+        for state in self._goto[0].values():
+            self._fail[state] = 0
+            queue.append(state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+
+                for output in self._outputs[self._fail[next_state]]:
+                    if output not in self._outputs[next_state]:
+                        self._outputs[next_state].append(output)
+
+        self._built = True
+
+    def find_all(self, text: str) -> List[KeywordMatch]:
+        """Return every (term, category, offset) hit in order of where each hit ends"""
+        if not self._built:
+            # Only after add(); two threads must not build at once
+            with self._lock:
+                if not self._built:
+                    self._build()
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for term, category in outputs[state]:
+                matches.append(KeywordMatch(term, category, index - len(term) + 1))
+
+        return matches
+
+    def find_terms(self, text: str) -> Dict[str, Set[str]]:
+        """Return the distinct terms found in the text, grouped by category"""
+        found = {}
+        for match in self.find_all(text):
+            found.setdefault(match.category, set()).add(match.term)
+        return found
@@ -0,0 +1,219 @@
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+# Seconds; covers in-memory work (sub-millisecond) through slow model calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _label_key(labels: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(key)} {value}"
+
+
+class Histogram:
+    """Bucketed observations per label set, with sum and count"""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (last slot is +Inf), then sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_label_key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = sorted((key, list(series[0]), series[1]) for key, series in self._series.items())
+        for key, counts, total in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(key, ('le', repr(float(bound))))} {cumulative}"
+            cumulative += counts[-1]
+            yield f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {total}"
+            yield f"{self.name}_count{_format_labels(key)} {cumulative}"
+
+
+class MetricsRegistry:
+    """Named counters and histograms rendered together in Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, name: str, factory):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = factory()
+        return metric
+
+    def counter(self, name: str, help_text: str = '') -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str = '', buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, help_text, buckets))
+
+    @contextmanager
+    def timer(self, name: str, help_text: str = '', **labels):
+        """Observe the duration of the block in seconds, whether or not it raises"""
+        histogram = self.histogram(name, help_text)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> str:
+        # Metrics may be registered while a scrape runs
+        with self._lock:
+            registered = sorted(self._metrics.items())
+        lines = []
+        for _, metric in registered:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def write_file(self, path: str):
+        """Write the exposition atomically, e.g. for node_exporter's textfile collector"""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+
+# Process-wide registry used by the core modules
+metrics = MetricsRegistry()
+
+
+STAGE_METRIC = 'jurneego_stage_seconds'
+STAGE_HELP = 'Latency of chat pipeline stages'
+
+
+def stage_timer(stage: str):
+    """Time one stage of the chat pipeline"""
+    return metrics.timer(STAGE_METRIC, STAGE_HELP, stage=stage)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record a stage duration measured by the caller (e.g. across a stream)"""
+    metrics.histogram(STAGE_METRIC, STAGE_HELP).observe(seconds, stage=stage)
+
+
+def record_error(stage: str):
+    metrics.counter('jurneego_errors_total', 'Errors by pipeline stage').inc(stage=stage)
+
+
+_export_lock = threading.Lock()
+_exporters_started = False
+
+
+def start_metrics_export(registry: MetricsRegistry = metrics):
+    """
+    Serve /metrics on METRICS_PORT (bound to METRICS_ADDR, default 127.0.0.1) and/or
+    rewrite METRICS_FILE every METRICS_FILE_INTERVAL seconds. Safe to call repeatedly.
+    """
+    global _exporters_started
+    with _export_lock:
+        if _exporters_started:
+            return
+        _exporters_started = True
+
+    port = int(os.getenv('METRICS_PORT', '0'))
+    if port:
+        # Only imported when the endpoint is enabled
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            server = ThreadingHTTPServer((os.getenv('METRICS_ADDR', '127.0.0.1'), port), MetricsHandler)
+            threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        except OSError as e:
+            print(f"Metrics endpoint not started on port {port}: {e}")
+
+    path = os.getenv('METRICS_FILE')
+    if path:
+        interval = float(os.getenv('METRICS_FILE_INTERVAL', '15'))
+
+        def write_periodically():
+            while True:
+                try:
+                    registry.write_file(path)
+                except OSError as e:
+                    print(f"Could not write metrics file {path}: {e}")
+                time.sleep(interval)
+
+        threading.Thread(target=write_periodically, name='metrics-file', daemon=True).start()
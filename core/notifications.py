@@ -0,0 +1,327 @@
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .metrics import metrics
+
+SEVERITY_ORDER = {'INFO': 0, 'LOW': 1, 'MEDIUM': 2, 'HIGH': 3, 'CRITICAL': 4}
+
+# Queue priorities: critical alerts jump ahead of digests
+_PRIORITY_IMMEDIATE = 0
+_PRIORITY_DIGEST = 1
+_STOP = object()
+
+
+class NotificationSink:
+    """Delivers a batch of notifications for one parent"""
+
+    name = 'sink'
+
+    def send(self, parent_id: str, notifications: List[Dict], digest: bool):
+        raise NotImplementedError
+
+
+class LogSink(NotificationSink):
+    """Print to stdout, as the prototype always did"""
+
+    name = 'log'
+
+    def send(self, parent_id: str, notifications: List[Dict], digest: bool):
+        if digest:
+            print(f"Parent notification digest for {parent_id}: {digest_summary(notifications)}")
+        else:
+            for notification in notifications:
+                print(f"Parent notification ({notification['severity']}) for {parent_id}: {notification['summary']}")
+
+
+class FileSink(NotificationSink):
+    """Append one JSON line per delivery"""
+
+    name = 'file'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, parent_id: str, notifications: List[Dict], digest: bool):
+        line = json.dumps({
+            'parent_id': parent_id,
+            'digest': digest,
+            'sent_at': datetime.now().isoformat(),
+            'notifications': notifications
+        })
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+
+
+class WebhookSink(NotificationSink):
+    """POST the batch as JSON, e.g. to a local stub or a push-notification relay"""
+
+    name = 'webhook'
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+
+    def send(self, parent_id: str, notifications: List[Dict], digest: bool):
+        import urllib.request
+        body = json.dumps({'parent_id': parent_id, 'digest': digest, 'notifications': notifications}).encode()
+        request = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class SmtpSink(NotificationSink):
+    """
+    Email through an SMTP server; for local runs use a debug server such as
+    `python -m aiosmtpd -n -l localhost:1025`. `to_address` may contain
+    {parent_id} to address parents individually.
+    """
+
+    name = 'smtp'
+
+    def __init__(self, host: str, port: int, from_address: str, to_address: str, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.from_address = from_address
+        self.to_address = to_address
+        self.timeout = timeout
+
+    def send(self, parent_id: str, notifications: List[Dict], digest: bool):
+        import smtplib
+        from email.message import EmailMessage
+
+        email = EmailMessage()
+        top = max(notifications, key=lambda n: SEVERITY_ORDER.get(n['severity'], 0))
+        email['Subject'] = (f"JurneeGo activity digest: {digest_summary(notifications)}" if digest
+                            else f"JurneeGo {top['severity']} alert: {top['summary']}")
+        email['From'] = self.from_address
+        email['To'] = self.to_address.format(parent_id=parent_id)
+        email.set_content('\n'.join(
+            f"[{n['timestamp']}] {n['severity']} - {n['summary']}" for n in notifications
+        ))
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as server:
+            server.send_message(email)
+
+
+def digest_summary(notifications: List[Dict]) -> str:
+    """e.g. '12 updates (1 HIGH, 11 INFO) in 2 conversations'"""
+    counts = {}
+    for notification in notifications:
+        counts[notification['severity']] = counts.get(notification['severity'], 0) + 1
+    by_severity = ', '.join(
+        f"{count} {severity}" for severity, count in
+        sorted(counts.items(), key=lambda item: SEVERITY_ORDER.get(item[0], 0), reverse=True)
+    )
+    conversations = len({n['conversation_id'] for n in notifications})
+    return f"{len(notifications)} updates ({by_severity}) in {conversations} conversation{'s' if conversations != 1 else ''}"
+
+
+class NotificationDispatcher:
+    """
+    Background delivery of parent notifications. notify() never blocks: CRITICAL
+    notifications are queued for immediate delivery, everything else is held per
+    parent and sent as one digest every `digest_interval` seconds. Worker threads
+    deliver to every sink; a failing sink is logged and doesn't stop the others.
+    When the queue is full new items are dropped (and counted) rather than
+    slowing the caller. After close() notifications are rejected, since no worker
+    is left to deliver them.
+    """
+
+    def __init__(
+        self,
+        sinks: List[NotificationSink],
+        workers: int = 2,
+        digest_interval: float = 60,
+        max_queue: int = 10000,
+        max_digest_items: int = 200
+    ):
+        self.sinks = sinks
+        self.workers = workers
+        self.digest_interval = digest_interval
+        self.max_digest_items = max_digest_items
+        self._queue = queue.PriorityQueue(maxsize=max_queue)
+        self._sequence = itertools.count()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._threads = []
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._closed = False
+        # Updated from script threads and workers alike
+        self._counter_lock = threading.Lock()
+        self.counters = {'notified': 0, 'immediate': 0, 'digests': 0, 'delivered': 0,
+                         'failed': 0, 'dropped': 0, 'trimmed': 0, 'rejected': 0}
+
+    def _count(self, name: str):
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f'notify-worker-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            flusher = threading.Thread(target=self._flush_periodically, name='notify-digest', daemon=True)
+            flusher.start()
+            self._threads.append(flusher)
+            self._started = True
+
+    def notify(self, parent_id: str, notification: Dict):
+        """Queue a notification for a parent; returns immediately"""
+        # Checked under the lock close() sets it with, so nothing is queued after its drain
+        with self._pending_lock:
+            if self._closed:
+                self._count('rejected')
+                print(f"Notification for {parent_id} rejected: dispatcher is closed")
+                return
+            self._ensure_started()
+            self._count('notified')
+
+            if notification['severity'] == 'CRITICAL':
+                self._count('immediate')
+                self._enqueue(_PRIORITY_IMMEDIATE, (parent_id, [notification], False))
+                return
+
+            pending = self._pending.get(parent_id)
+            if pending is None:
+                pending = self._pending[parent_id] = deque(maxlen=self.max_digest_items)
+            if len(pending) == self.max_digest_items:
+                # Digests stay bounded; the oldest routine update is dropped
+                self._count('trimmed')
+            pending.append(notification)
+
+    def _enqueue(self, priority: int, item):
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), item))
+        except queue.Full:
+            self._count('dropped')
+            # Its own metric: a dropped item never reached a sink, so it has no sink label
+            metrics.counter('jurneego_notifications_dropped_total', 'Parent notifications dropped on a full queue').inc(
+                kind='digest' if item[2] else 'immediate'
+            )
+
+    def flush_digests(self):
+        """Queue a digest for every parent with pending notifications"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for parent_id, notifications in pending.items():
+            self._count('digests')
+            self._enqueue(_PRIORITY_DIGEST, (parent_id, list(notifications), True))
+
+    def _flush_periodically(self):
+        while not self._stopping.wait(self.digest_interval):
+            self.flush_digests()
+
+    def _work(self):
+        while True:
+            _, _, item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._deliver(*item)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, parent_id: str, notifications: List[Dict], digest: bool):
+        started = time.perf_counter()
+        for sink in self.sinks:
+            try:
+                sink.send(parent_id, notifications, digest)
+                self._count('delivered')
+                outcome = 'delivered'
+            except Exception as e:
+                self._count('failed')
+                outcome = 'failed'
+                print(f"Notification sink {sink.name} failed for {parent_id}: {e}")
+            metrics.counter('jurneego_notifications_total', 'Parent notifications by outcome').inc(
+                outcome=outcome, sink=sink.name, kind='digest' if digest else 'immediate'
+            )
+        metrics.histogram('jurneego_notification_delivery_seconds', 'Time to deliver to all sinks').observe(
+            time.perf_counter() - started, kind='digest' if digest else 'immediate'
+        )
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """Send pending digests and wait until the queue is empty (for shutdown and tests)"""
+        self.flush_digests()
+        if not self._started:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self, timeout: float = 5.0):
+        """
+        Stop accepting notifications, deliver what is pending and stop the worker
+        threads, waiting at most `timeout` seconds in total. Workers still busy
+        after that are left to finish on their own.
+        """
+        deadline = time.monotonic() + timeout
+        with self._pending_lock:
+            self._closed = True
+        self.drain(timeout)
+        self._stopping.set()
+        if self._started:
+            for _ in range(self.workers):
+                try:
+                    self._queue.put((_PRIORITY_DIGEST + 1, next(self._sequence), _STOP),
+                                    timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Full:
+                    print("Notification queue still full at close; workers will stop once it drains")
+                    break
+
+    def stats(self) -> Dict:
+        with self._counter_lock:
+            stats = dict(self.counters)
+        stats['queued'] = self._queue.qsize()
+        with self._pending_lock:
+            stats['pending_digest_items'] = sum(len(items) for items in self._pending.values())
+        return stats
+
+
+def create_notification_dispatcher() -> NotificationDispatcher:
+    """
+    Dispatcher with the sinks listed in NOTIFY_SINKS (comma separated: log, file,
+    webhook, smtp). NOTIFY_FILE, NOTIFY_WEBHOOK_URL and NOTIFY_SMTP_* configure them.
+    """
+    sinks = []
+    for name in os.getenv('NOTIFY_SINKS', 'log').split(','):
+        name = name.strip().lower()
+        if name == 'log':
+            sinks.append(LogSink())
+        elif name == 'file':
+            sinks.append(FileSink(os.getenv('NOTIFY_FILE', 'parent_notifications.jsonl')))
+        elif name == 'webhook':
+            sinks.append(WebhookSink(os.getenv('NOTIFY_WEBHOOK_URL', 'http://127.0.0.1:8089/notify')))
+        elif name == 'smtp':
+            sinks.append(SmtpSink(
+                os.getenv('NOTIFY_SMTP_HOST', 'localhost'),
+                int(os.getenv('NOTIFY_SMTP_PORT', '1025')),
+                os.getenv('NOTIFY_SMTP_FROM', 'alerts@jurneego.local'),
+                os.getenv('NOTIFY_SMTP_TO', '{parent_id}@parents.jurneego.local')
+            ))
+        elif name:
+            print(f"Unknown notification sink '{name}' ignored")
+
+    return NotificationDispatcher(
+        sinks,
+        workers=int(os.getenv('NOTIFY_WORKERS', '2')),
+        digest_interval=float(os.getenv('NOTIFY_DIGEST_INTERVAL', '60')),
+        max_queue=int(os.getenv('NOTIFY_MAX_QUEUE', '10000'))
+    )
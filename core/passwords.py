@@ -0,0 +1,185 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+_LEGACY_HEX_LENGTH = 64
+
+
+def legacy_sha256(password: str) -> str:
+    """The original unsalted SHA-256 format, kept only so old hashes verify"""
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def _is_legacy(stored_hash: str) -> bool:
+    return len(stored_hash) == _LEGACY_HEX_LENGTH and all(c in '0123456789abcdef' for c in stored_hash)
+
+
+class PasswordHasher:
+    """
+    Salted, deliberately slow password hashing run on a bounded thread pool. The
+    pool caps how many hashes run at once, so a burst of logins can't saturate
+    the CPU; the calling script thread still waits for its own hash to finish.
+    bcrypt, argon2 and hashlib's PBKDF2 all release the GIL while hashing. Falls
+    back to PBKDF2 when the configured library isn't installed.
+
+    Successful verifications are remembered for `cache_ttl` seconds under a keyed
+    digest of (stored hash, password), so repeat logins with the same credentials
+    skip the expensive check; a changed hash never matches an old entry.
+    """
+
+    def __init__(
+        self,
+        scheme: str = 'bcrypt',
+        bcrypt_rounds: int = 12,
+        pbkdf2_iterations: int = 600000,
+        workers: int = 2,
+        cache_size: int = 1024,
+        cache_ttl: float = 300
+    ):
+        self.scheme = self._available_scheme(scheme)
+        self.bcrypt_rounds = bcrypt_rounds
+        self.pbkdf2_iterations = pbkdf2_iterations
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()
+        self._cache_key = os.urandom(32)
+        self._cache_lock = threading.Lock()
+        self._counter_lock = threading.Lock()
+        self.counters = {'hashes': 0, 'verifications': 0, 'cache_hits': 0, 'rehashes': 0}
+
+    def _count(self, name: str):
+        with self._counter_lock:
+            self.counters[name] += 1
+
+    @staticmethod
+    def _available_scheme(scheme: str) -> str:
+        module_name = {'bcrypt': 'bcrypt', 'argon2': 'argon2'}.get(scheme)
+        if module_name is None:
+            return 'pbkdf2'
+        try:
+            __import__(module_name)
+            return scheme
+        except ImportError:
+            print(f"{module_name} is not installed; hashing passwords with PBKDF2 instead")
+            return 'pbkdf2'
+
+    def hash(self, password: str) -> str:
+        """Hash a password on the worker pool, blocking until it's done"""
+        self._count('hashes')
+        return self._pool.submit(self._hash, password).result()
+
+    def verify(self, password: str, stored_hash: str) -> bool:
+        """Check a password against any supported hash format on the worker pool, blocking until it's done"""
+        self._count('verifications')
+        cache_key = self._cache_digest(password, stored_hash)
+        if self._cache_get(cache_key):
+            self._count('cache_hits')
+            return True
+
+        valid = self._pool.submit(self._verify, password, stored_hash).result()
+        if valid:
+            self._cache_put(cache_key)
+        return valid
+
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True for legacy hashes and hashes made with another scheme or cost"""
+        if self.scheme == 'bcrypt':
+            return not stored_hash.startswith(f"$2b${self.bcrypt_rounds:02d}$")
+        if self.scheme == 'argon2':
+            if not stored_hash.startswith('$argon2'):
+                return True
+            from argon2 import PasswordHasher as Argon2Hasher
+            return Argon2Hasher().check_needs_rehash(stored_hash)
+        return not stored_hash.startswith(f"pbkdf2_sha256${self.pbkdf2_iterations}$")
+
+    def upgrade(self, password: str, stored_hash: str) -> Optional[str]:
+        """New hash for a just-verified password whose stored hash is outdated, else None"""
+        if not self.needs_rehash(stored_hash):
+            return None
+        self._count('rehashes')
+        new_hash = self.hash(password)
+        self._cache_put(self._cache_digest(password, new_hash))
+        return new_hash
+
+    def stats(self) -> Dict:
+        with self._counter_lock:
+            counters = dict(self.counters)
+        return {'scheme': self.scheme, **counters, 'cached': len(self._cache)}
+
+    def _hash(self, password: str) -> str:
+        if self.scheme == 'bcrypt':
+            import bcrypt
+            return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.bcrypt_rounds)).decode()
+        if self.scheme == 'argon2':
+            from argon2 import PasswordHasher as Argon2Hasher
+            return Argon2Hasher().hash(password)
+
+        salt = os.urandom(16)
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, self.pbkdf2_iterations)
+        return 'pbkdf2_sha256${}${}${}'.format(
+            self.pbkdf2_iterations,
+            base64.b64encode(salt).decode(),
+            base64.b64encode(digest).decode()
+        )
+
+    @staticmethod
+    def _verify(password: str, stored_hash: str) -> bool:
+        if stored_hash.startswith('$2'):
+            import bcrypt
+            return bcrypt.checkpw(password.encode(), stored_hash.encode())
+        if stored_hash.startswith('$argon2'):
+            from argon2 import PasswordHasher as Argon2Hasher
+            from argon2.exceptions import VerificationError, InvalidHashError
+            try:
+                return Argon2Hasher().verify(stored_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        if stored_hash.startswith('pbkdf2_sha256$'):
+            _, iterations, salt, expected = stored_hash.split('$')
+            digest = hashlib.pbkdf2_hmac('sha256', password.encode(), base64.b64decode(salt), int(iterations))
+            return hmac.compare_digest(digest, base64.b64decode(expected))
+        if _is_legacy(stored_hash):
+            return hmac.compare_digest(legacy_sha256(password), stored_hash)
+        return False
+
+    def _cache_digest(self, password: str, stored_hash: str) -> bytes:
+        return hmac.new(self._cache_key, f"{stored_hash}\0{password}".encode(), hashlib.blake2b).digest()
+
+    def _cache_get(self, key: bytes) -> bool:
+        with self._cache_lock:
+            expires_at = self._cache.get(key)
+            if expires_at is None:
+                return False
+            if expires_at <= time.monotonic():
+                del self._cache[key]
+                return False
+            return True
+
+    def _cache_put(self, key: bytes):
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = time.monotonic() + self.cache_ttl
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+def create_password_hasher() -> PasswordHasher:
+    """Hasher configured from PASSWORD_HASH_SCHEME, BCRYPT_ROUNDS and related settings"""
+    return PasswordHasher(
+        scheme=os.getenv('PASSWORD_HASH_SCHEME', 'bcrypt').lower(),
+        bcrypt_rounds=int(os.getenv('BCRYPT_ROUNDS', '12')),
+        pbkdf2_iterations=int(os.getenv('PBKDF2_ITERATIONS', '600000')),
+        workers=int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1)))),
+        cache_size=int(os.getenv('PASSWORD_CACHE_SIZE', '1024')),
+        cache_ttl=float(os.getenv('PASSWORD_CACHE_TTL', '300'))
+    )
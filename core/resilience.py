@@ -0,0 +1,237 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+# Error codes Bedrock returns when it is throttling or temporarily unavailable
+RETRYABLE_ERROR_CODES = {
+    'ThrottlingException',
+    'TooManyRequestsException',
+    'ServiceUnavailableException',
+    'ModelNotReadyException',
+    'InternalServerException',
+    'ModelTimeoutException'
+}
+
+# botocore transport errors, matched by name so botocore isn't needed to import this module
+RETRYABLE_ERROR_TYPES = {
+    'ReadTimeoutError',
+    'ConnectTimeoutError',
+    'EndpointConnectionError',
+    'ConnectionClosedError'
+}
+
+
+class CircuitOpenError(Exception):
+    """Raised when the circuit breaker is refusing calls"""
+
+
+class QueueTimeoutError(TimeoutError):
+    """
+    Raised when no local concurrency slot frees up in time. The call never reached
+    the service, so it is neither retried nor counted against the breaker.
+    """
+
+
+def is_retryable(error: Exception) -> bool:
+    """Decide whether an error from a boto3-style client is worth retrying"""
+    if type(error).__name__ in RETRYABLE_ERROR_TYPES:
+        return True
+
+    response = getattr(error, 'response', None) or {}
+    if response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES:
+        return True
+
+    status = response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0)
+    return status == 429 or status >= 500
+
+
+class CircuitBreaker:
+    """
+    Trip when the failure rate over the last `window` calls reaches `failure_rate`.
+    While open, calls are refused for `cooldown` seconds; then one trial call is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_rate: float = 0.5, window: int = 20, min_calls: int = 5, cooldown: float = 30.0):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go ahead"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = 'half_open'
+                self._trial_in_flight = False
+
+            if self.state == 'half_open' and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state == 'half_open':
+                self.state = 'closed'
+                self._outcomes.clear()
+            self._outcomes.append(True)
+
+    def record_failure(self) -> bool:
+        """Record a failed call; returns True if this failure tripped the breaker"""
+        with self._lock:
+            if self.state == 'half_open':
+                self._open()
+                return True
+
+            self._outcomes.append(False)
+            failures = self._outcomes.count(False)
+            if (self.state == 'closed' and len(self._outcomes) >= self.min_calls
+                    and failures / len(self._outcomes) >= self.failure_rate):
+                self._open()
+                return True
+            return False
+
+    def record_skipped(self):
+        """Forget a call that never reached the service, so a half-open trial can be retried"""
+        with self._lock:
+            if self.state == 'half_open':
+                self._trial_in_flight = False
+
+    def _open(self):
+        self.state = 'open'
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+
+class ResilientInvoker:
+    """
+    Run calls with jittered exponential backoff on retryable errors, a circuit
+    breaker, and optional hedging: if a call hasn't finished after `hedge_after`
+    seconds a duplicate is started and whichever finishes first wins.
+    """
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.25,
+        max_delay: float = 4.0,
+        hedge_after: Optional[float] = None,
+        hedge_workers: int = 16,
+        breaker: Optional[CircuitBreaker] = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_after = hedge_after
+        self.breaker = breaker or CircuitBreaker()
+        self._sleep = sleep
+        # Every hedged call runs on this pool, so it must fit all concurrent calls plus their hedges
+        self._executor = ThreadPoolExecutor(
+            max_workers=hedge_workers, thread_name_prefix='bedrock-hedge'
+        ) if hedge_after else None
+        self._lock = threading.Lock()
+        self.counters = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'retries': 0,
+            'trips': 0,
+            'short_circuits': 0,
+            'hedges': 0,
+            'hedge_wins': 0,
+            'queue_timeouts': 0
+        }
+
+    def _count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def call(self, func: Callable, hedge: bool = True):
+        """Invoke func() with retries, circuit breaking and (optionally) hedging"""
+        self._count('calls')
+
+        if not self.breaker.allow_request():
+            self._count('short_circuits')
+            raise CircuitOpenError("Bedrock circuit breaker is open")
+
+        attempt = 0
+        while True:
+            try:
+                result = self._hedged(func) if hedge and self._executor else func()
+            except QueueTimeoutError:
+                # Local overload says nothing about the service's health
+                self._count('queue_timeouts')
+                self.breaker.record_skipped()
+                raise
+            except Exception as e:
+                if is_retryable(e) and attempt < self.max_retries:
+                    self._count('retries')
+                    self._sleep(self.backoff_delay(attempt))
+                    attempt += 1
+                    continue
+
+                self.record_failure()
+                raise
+
+            self._count('successes')
+            self.breaker.record_success()
+            return result
+
+    def record_failure(self):
+        """Count a failure that surfaced after call() returned, e.g. while reading a stream"""
+        self._count('failures')
+        if self.breaker.record_failure():
+            self._count('trips')
+
+    def _hedged(self, func: Callable):
+        """Run func, starting a duplicate if the first call is slower than hedge_after"""
+        started = threading.Event()
+
+        def run_primary():
+            started.set()
+            return func()
+
+        primary = self._executor.submit(run_primary)
+        # Time spent queued for a pool thread doesn't count towards hedge_after
+        started.wait()
+        done, _ = wait([primary], timeout=self.hedge_after)
+        if done:
+            return primary.result()
+
+        self._count('hedges')
+        backup = self._executor.submit(func)
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count('hedge_wins')
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self) -> Dict:
+        """Snapshot of counters plus the breaker state"""
+        with self._lock:
+            stats = dict(self.counters)
+        stats['circuit_state'] = self.breaker.state
+        return stats
@@ -0,0 +1,156 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+# Words that don't change what is being asked; everything else (nouns, numbers,
+# adjectives) must match exactly for two questions to share an answer
+STOPWORDS = frozenset("""
+    a an the is are was were be do does did can could would should will what whats why whys how hows
+    who whos when where which tell me about please i you my your it its of to in on for and or
+""".split())
+
+def normalize_question(text: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace"""
+    return ' '.join(re.sub(r"[^\w\s']", ' ', text.lower()).split())
+
+
+def _words(normalized: str) -> FrozenSet[str]:
+    """Tokens with contractions and plain plurals folded ("why's" -> "why", "cats" -> "cat")"""
+    words = set()
+    for token in normalized.split():
+        token = token.split("'")[0]
+        if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+            token = token[:-1]
+        if token:
+            words.add(token)
+    return frozenset(words)
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of model responses keyed on the normalized question and a
+    scope tuple holding everything else the prompt depends on (age, interests,
+    learning level...). Matching is exact by default. With a similarity
+    threshold set, a near-duplicate question ("why is the sky blue" / "why's the
+    sky blue?") may reuse an answer, but only one with exactly the same content
+    words and a word-level Jaccard similarity at or above the threshold, so
+    "12 times 12" never answers "12 times 13".
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: float = 3600,
+        similarity_threshold: Optional[float] = None
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        # key -> {'response', 'model_used', 'expires_at', 'words'}
+        self._entries = OrderedDict()
+        # (scope, content words) -> keys, for near-duplicate lookup
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'near_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    def get(self, question: str, scope: Tuple[str, ...]) -> Optional[Dict]:
+        """Return {'response', 'model_used', 'near_duplicate'} for a cached answer, or None"""
+        normalized = normalize_question(question)
+        key = (normalized, scope)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            near_duplicate = False
+
+            if entry is None and self.similarity_threshold:
+                key, entry = self._find_similar(scope, normalized, now)
+                near_duplicate = entry is not None
+
+            if entry is None:
+                self.counters['misses'] += 1
+                return None
+
+            if entry['expires_at'] <= now:
+                self._remove(key)
+                self.counters['expirations'] += 1
+                self.counters['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.counters['near_hits' if near_duplicate else 'hits'] += 1
+            return {
+                'response': entry['response'],
+                'model_used': entry['model_used'],
+                'near_duplicate': near_duplicate
+            }
+
+    def _find_similar(self, scope: Tuple[str, ...], normalized: str, now: float):
+        """Most similar live entry with the same content words, if it clears the threshold"""
+        words = _words(normalized)
+        best_key, best_entry, best_score = None, None, self.similarity_threshold
+        for candidate in self._buckets.get((scope, words - STOPWORDS), ()):
+            entry = self._entries[candidate]
+            if entry['expires_at'] <= now:
+                continue
+            score = len(words & entry['words']) / len(words | entry['words'])
+            if score >= best_score:
+                best_key, best_entry, best_score = candidate, entry, score
+
+        return best_key, best_entry
+
+    def put(self, question: str, scope: Tuple[str, ...], response: str, model_used: str):
+        """Store a response, evicting the least recently used entry when full"""
+        normalized = normalize_question(question)
+        key = (normalized, scope)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            words = _words(normalized) if self.similarity_threshold else None
+            self._entries[key] = {
+                'response': response,
+                'model_used': model_used,
+                'expires_at': time.monotonic() + self.ttl_seconds,
+                'words': words
+            }
+            if words is not None:
+                self._buckets.setdefault((scope, words - STOPWORDS), set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.counters['evictions'] += 1
+
+    def _remove(self, key: Tuple[str, Tuple[str, ...]]):
+        entry = self._entries.pop(key)
+        if entry['words'] is not None:
+            bucket_key = (key[1], entry['words'] - STOPWORDS)
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> Dict:
+        """Counters, hit ratio and an estimate of the memory held by cached entries"""
+        with self._lock:
+            stats = dict(self.counters)
+            stats['entries'] = len(self._entries)
+            stats['memory_bytes'] = sum(
+                sys.getsizeof(key[0]) + sys.getsizeof(entry['response']) + sys.getsizeof(entry['words'] or ())
+                for key, entry in self._entries.items()
+            )
+
+        lookups = stats['hits'] + stats['near_hits'] + stats['misses']
+        stats['hit_ratio'] = (stats['hits'] + stats['near_hits']) / lookups if lookups else 0.0
+        return stats
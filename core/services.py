@@ -0,0 +1,81 @@
+import importlib
+import threading
+from typing import Callable, List
+
+
+class ServiceRegistry:
+    """
+    Process-wide services, each created once on first use and shared by every
+    session. Only user-specific state belongs in a session.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances = {}
+        self._factories = {}
+
+    def register(self, name: str, factory: Callable):
+        """Set the factory for a service; an existing instance is replaced on next use"""
+        with self._lock:
+            self._factories[name] = factory
+            self._instances.pop(name, None)
+
+    def get(self, name: str):
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            # Another thread may have created it while we waited
+            instance = self._instances.get(name)
+            if instance is None:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown service: {name}")
+                instance = self._factories[name]()
+                self._instances[name] = instance
+            return instance
+
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    def reset(self):
+        """Drop all instances (they are recreated lazily)"""
+        with self._lock:
+            self._instances.clear()
+
+
+# name -> (module, class); modules are imported only when the service is first used
+DEFAULT_SERVICES = {
+    'auth_manager': ('.auth', 'AuthManager'),
+    'bedrock_client': ('.bedrock_client', 'BedrockClient'),
+    'conversation_manager': ('.conversation', 'ConversationManager'),
+    'guardrails': ('.guardrails', 'COPPAGuardrails')
+}
+
+# Services the entry point creates up front; the Bedrock client (and boto3 with it)
+# is created by the chat page on first use so login stays fast
+STARTUP_SERVICES = ('auth_manager', 'conversation_manager', 'guardrails')
+
+
+def _lazy_factory(module_name: str, class_name: str) -> Callable:
+    def factory():
+        module = importlib.import_module(module_name, __package__)
+        return getattr(module, class_name)()
+    return factory
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_services() -> ServiceRegistry:
+    """The process-wide registry with the default services registered"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                registry = ServiceRegistry()
+                for name, (module_name, class_name) in DEFAULT_SERVICES.items():
+                    registry.register(name, _lazy_factory(module_name, class_name))
+                _registry = registry
+    return _registry
@@ -0,0 +1,251 @@
+from abc import ABC, abstractmethod
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class SessionStore(ABC):
+    """
+    Interface for login session backends used by AuthManager. Sessions expire
+    `ttl_seconds` after their last use; expired ones are removed lazily as the
+    store is used and, if started, by a background sweeper thread.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_sessions: int = 10000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sweeper = None
+        self._stop_sweeper = threading.Event()
+
+    @abstractmethod
+    def create(self, session_id: str, session: Dict):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Dict]:
+        """The session if it hasn't expired; using it extends its expiry"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, session_id: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Remove expired sessions; returns how many were removed"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def start_sweeper(self, interval: float = 60):
+        """Sweep expired sessions every `interval` seconds on a daemon thread"""
+        if self._sweeper is not None:
+            return
+        self._stop_sweeper.clear()
+
+        def run():
+            while not self._stop_sweeper.wait(interval):
+                try:
+                    self.sweep()
+                except Exception as e:
+                    print(f"Session sweep failed: {e}")
+
+        self._sweeper = threading.Thread(target=run, name='session-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def stop_sweeper(self):
+        self._stop_sweeper.set()
+        self._sweeper = None
+
+
+class MemorySessionStore(SessionStore):
+    """
+    Sessions in an OrderedDict kept in last-use order. With a single TTL that is
+    also expiry order, so sweeping only looks at the expired entries at the front,
+    and when the store is full the least recently used session is dropped.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_sessions: int = 10000):
+        super().__init__(ttl_seconds, max_sessions)
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, session_id: str, session: Dict):
+        with self._lock:
+            self._sweep_locked(time.time())
+            self._sessions[session_id] = (time.time() + self.ttl_seconds, session)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            now = time.time()
+            if entry[0] <= now:
+                del self._sessions[session_id]
+                return None
+            self._sessions[session_id] = (now + self.ttl_seconds, entry[1])
+            self._sessions.move_to_end(session_id)
+            return entry[1]
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep_locked(time.time())
+
+    def _sweep_locked(self, now: float) -> int:
+        removed = 0
+        while self._sessions:
+            session_id, (expires_at, _) = next(iter(self._sessions.items()))
+            if expires_at > now:
+                break
+            del self._sessions[session_id]
+            removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite table so they survive restarts and can be shared by
+    processes on one host. Expired rows are deleted every `sweep_every` writes
+    and by the sweeper; the oldest sessions are trimmed past `max_sessions`.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires_at);
+    """
+
+    def __init__(self, path: str, ttl_seconds: float = 3600, max_sessions: int = 10000, sweep_every: int = 100):
+        super().__init__(ttl_seconds, max_sessions)
+        self.path = path
+        self.sweep_every = sweep_every
+        self._writes = 0
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, session_id: str, session: Dict):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO sessions (id, data, expires_at) VALUES (?, ?, ?)",
+            (session_id, json.dumps(session), time.time() + self.ttl_seconds)
+        )
+        self._writes += 1
+        if self._writes % self.sweep_every == 0:
+            self.sweep()
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        conn = self._connection()
+        now = time.time()
+        row = conn.execute(
+            "SELECT data FROM sessions WHERE id = ? AND expires_at > ?", (session_id, now)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute("UPDATE sessions SET expires_at = ? WHERE id = ?", (now + self.ttl_seconds, session_id))
+        return json.loads(row[0])
+
+    def delete(self, session_id: str) -> bool:
+        return self._connection().execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount > 0
+
+    def sweep(self) -> int:
+        conn = self._connection()
+        removed = conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)).rowcount
+        removed += conn.execute(
+            "DELETE FROM sessions WHERE id NOT IN "
+            "(SELECT id FROM sessions ORDER BY expires_at DESC LIMIT ?)",
+            (self.max_sessions,)
+        ).rowcount
+        return removed
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM sessions WHERE expires_at > ?", (time.time(),)
+        ).fetchone()[0]
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions in Redis or any server speaking its protocol (a local redis-server,
+    KeyDB, ...). The server expires keys itself; memory is bounded by its
+    maxmemory policy rather than `max_sessions`. Needs the `redis` package.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float = 3600, max_sessions: int = 10000, prefix: str = 'jurneego:session:'):
+        super().__init__(ttl_seconds, max_sessions)
+        import redis  # optional dependency, only needed for this backend
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def create(self, session_id: str, session: Dict):
+        self.client.set(self.prefix + session_id, json.dumps(session), ex=int(self.ttl_seconds))
+
+    def get(self, session_id: str) -> Optional[Dict]:
+        key = self.prefix + session_id
+        data = self.client.get(key)
+        if data is None:
+            return None
+        self.client.expire(key, int(self.ttl_seconds))
+        return json.loads(data)
+
+    def delete(self, session_id: str) -> bool:
+        return self.client.delete(self.prefix + session_id) > 0
+
+    def sweep(self) -> int:
+        return 0
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.client.scan_iter(match=self.prefix + '*'))
+
+
+def create_session_store() -> SessionStore:
+    """
+    Backend from SESSION_STORE (memory, sqlite or redis). SESSION_DB_PATH and
+    REDIS_URL locate the sqlite and redis backends.
+    """
+    backend = os.getenv('SESSION_STORE', 'memory').lower()
+    ttl_seconds = float(os.getenv('SESSION_TTL', '3600'))
+    max_sessions = int(os.getenv('SESSION_MAX', '10000'))
+
+    if backend == 'sqlite':
+        store = SQLiteSessionStore(os.getenv('SESSION_DB_PATH', 'sessions.db'), ttl_seconds, max_sessions)
+    elif backend == 'redis':
+        store = RedisSessionStore(os.getenv('REDIS_URL', 'redis://localhost:6379/0'), ttl_seconds, max_sessions)
+    else:
+        store = MemorySessionStore(ttl_seconds, max_sessions)
+
+    # Seconds between background sweeps (0 leaves sweeping to normal use)
+    sweep_interval = float(os.getenv('SESSION_SWEEP_INTERVAL', '60'))
+    if sweep_interval > 0 and not isinstance(store, RedisSessionStore):
+        store.start_sweeper(sweep_interval)
+    return store
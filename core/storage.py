@@ -0,0 +1,469 @@
+from abc import ABC, abstractmethod
+import bisect
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Optional
+
+
+class ConversationStore(ABC):
+    """Interface for conversation persistence backends used by ConversationManager"""
+
+    @abstractmethod
+    def create_conversation(self, conversation: Dict):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_conversation(self, conversation_id: str) -> Optional[Dict]:
+        """Full conversation including messages, bookmarks and flags"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_conversation_info(self, conversation_id: str) -> Optional[Dict]:
+        """Conversation fields without messages, bookmarks or flags"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_conversations_by_parent(self, parent_id: str) -> List[Dict]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_conversations(self, user_id: Optional[str] = None) -> Iterator[Dict]:
+        """Full conversations, oldest first, optionally only those of one user"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def list_conversations(
+        self,
+        parent_id: str,
+        before: Optional[str] = None,
+        limit: int = 20,
+        user_id: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Newest-first conversation info (with message_count and flag_count, no
+        messages) for a parent, optionally one child, with ids below `before`
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_messages(self, conversation_id: str, before: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Up to `limit` messages preceding message `before` (or the end), oldest first"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_message(self, conversation_id: str, message: Dict) -> Optional[Dict]:
+        """Append a message; returns the conversation info, or None if it doesn't exist"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def append_to_message(self, conversation_id: str, message_id: str, field: str, entry: Dict) -> bool:
+        """Append an entry to a message's 'reactions' or 'curator_notes' list"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_bookmark(self, conversation_id: str, bookmark: Dict) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_flag(self, flag: Dict):
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_flagged_content(self) -> List[Dict]:
+        raise NotImplementedError
+
+
+class MemoryConversationStore(ConversationStore):
+    """
+    Dict-backed store; data lives only as long as the process. Keeps a
+    parent_id -> conversation ids index and, per conversation, a
+    message_id -> list position map so lookups don't scan.
+    """
+
+    def __init__(self):
+        self.conversations = {}
+        self.flagged_content = []
+        self.parent_index = {}
+        self.message_positions = {}
+        self._lock = threading.RLock()
+
+    def create_conversation(self, conversation: Dict):
+        with self._lock:
+            self.conversations[conversation['id']] = conversation
+            self.message_positions[conversation['id']] = {
+                msg['id']: position for position, msg in reversed(list(enumerate(conversation['messages'])))
+            }
+            if conversation.get('parent_id'):
+                self.parent_index.setdefault(conversation['parent_id'], []).append(conversation['id'])
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict]:
+        return self.conversations.get(conversation_id)
+
+    def get_conversation_info(self, conversation_id: str) -> Optional[Dict]:
+        return self.conversations.get(conversation_id)
+
+    def get_conversations_by_parent(self, parent_id: str) -> List[Dict]:
+        return [self.conversations[conv_id] for conv_id in list(self.parent_index.get(parent_id, ()))]
+
+    def iter_conversations(self, user_id: Optional[str] = None) -> Iterator[Dict]:
+        return iter([
+            conv for conv in list(self.conversations.values())
+            if user_id is None or conv['user_id'] == user_id
+        ])
+
+    def list_conversations(
+        self,
+        parent_id: str,
+        before: Optional[str] = None,
+        limit: int = 20,
+        user_id: Optional[str] = None
+    ) -> List[Dict]:
+        # Ids are time-sortable and appended in creation order, so the index is sorted
+        conv_ids = self.parent_index.get(parent_id, [])
+        end = bisect.bisect_left(conv_ids, before) if before else len(conv_ids)
+
+        page = []
+        for conv_id in reversed(conv_ids[:end]):
+            conv = self.conversations[conv_id]
+            if user_id and conv['user_id'] != user_id:
+                continue
+            info = {k: v for k, v in conv.items() if k not in ('messages', 'bookmarks', 'flags')}
+            info['message_count'] = len(conv['messages'])
+            info['flag_count'] = len(conv['flags'])
+            page.append(info)
+            if len(page) >= limit:
+                break
+        return page
+
+    def get_messages(self, conversation_id: str, before: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        conv = self.conversations.get(conversation_id)
+        if conv is None:
+            return []
+
+        end = len(conv['messages'])
+        if before is not None:
+            end = self.message_positions[conversation_id].get(before, end)
+        start = max(0, end - limit) if limit is not None else 0
+        return conv['messages'][start:end]
+
+    def add_message(self, conversation_id: str, message: Dict) -> Optional[Dict]:
+        with self._lock:
+            conv = self.conversations.get(conversation_id)
+            if conv is None:
+                return None
+            # First message wins on duplicate ids, matching a front-to-back scan
+            self.message_positions[conversation_id].setdefault(message['id'], len(conv['messages']))
+            conv['messages'].append(message)
+            return conv
+
+    def append_to_message(self, conversation_id: str, message_id: str, field: str, entry: Dict) -> bool:
+        with self._lock:
+            conv = self.conversations.get(conversation_id)
+            if conv is None:
+                return False
+            position = self.message_positions[conversation_id].get(message_id)
+            if position is None:
+                return False
+            conv['messages'][position][field].append(entry)
+            return True
+
+    def add_bookmark(self, conversation_id: str, bookmark: Dict) -> bool:
+        with self._lock:
+            conv = self.conversations.get(conversation_id)
+            if conv is None:
+                return False
+            conv['bookmarks'].append(bookmark)
+            return True
+
+    def add_flag(self, flag: Dict):
+        with self._lock:
+            self.flagged_content.append(flag)
+            conv = self.conversations.get(flag['conversation_id'])
+            if conv is not None:
+                conv['flags'].append(flag)
+
+    def get_flagged_content(self) -> List[Dict]:
+        return list(self.flagged_content)
+
+
+class SQLiteConversationStore(ConversationStore):
+    """
+    SQLite store in WAL mode so readers don't block the writer. Each thread gets
+    its own connection; writes that touch more than one row run in a transaction.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS conversations (
+            id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            user_role TEXT NOT NULL,
+            parent_id TEXT,
+            created_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS messages (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation_id TEXT NOT NULL REFERENCES conversations(id),
+            id TEXT NOT NULL,
+            role TEXT NOT NULL,
+            content TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            metadata TEXT NOT NULL DEFAULT '{}',
+            reactions TEXT NOT NULL DEFAULT '[]',
+            curator_notes TEXT NOT NULL DEFAULT '[]'
+        );
+        CREATE TABLE IF NOT EXISTS bookmarks (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation_id TEXT NOT NULL REFERENCES conversations(id),
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS flags (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation_id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_conversations_parent ON conversations(parent_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_conversations_user ON conversations(user_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_conversations_parent_page ON conversations(parent_id, id);
+        CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id, seq);
+        CREATE INDEX IF NOT EXISTS idx_messages_id ON messages(conversation_id, id);
+        DROP INDEX IF EXISTS idx_messages_timestamp;
+        CREATE INDEX IF NOT EXISTS idx_bookmarks_conversation ON bookmarks(conversation_id, seq);
+        CREATE INDEX IF NOT EXISTS idx_flags_conversation ON flags(conversation_id, seq);
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; multi-statement writes open their own transaction
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    @staticmethod
+    def _info_from_row(row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'user_id': row['user_id'],
+            'user_role': row['user_role'],
+            'parent_id': row['parent_id'],
+            'created_at': row['created_at']
+        }
+
+    @staticmethod
+    def _message_from_row(row: sqlite3.Row) -> Dict:
+        return {
+            'id': row['id'],
+            'role': row['role'],
+            'content': row['content'],
+            'timestamp': row['timestamp'],
+            'metadata': json.loads(row['metadata']),
+            'reactions': json.loads(row['reactions']),
+            'curator_notes': json.loads(row['curator_notes'])
+        }
+
+    # Conversations loaded per query by _load_many, well under SQLite's bound-parameter limit
+    LOAD_BATCH = 500
+
+    def _load(self, info: Dict) -> Dict:
+        """Attach messages, bookmarks and flags to conversation info"""
+        return self._load_many([info])[0]
+
+    def _load_many(self, infos: List[Dict]) -> List[Dict]:
+        """_load for many conversations with one query per table rather than per conversation"""
+        conn = self._connection()
+        convs = {}
+        for info in infos:
+            convs[info['id']] = dict(info, messages=[], bookmarks=[], flags=[])
+        if not convs:
+            return []
+
+        placeholders = ','.join('?' * len(convs))
+        ids = list(convs)
+        for row in conn.execute(
+            f"SELECT * FROM messages WHERE conversation_id IN ({placeholders}) ORDER BY seq", ids
+        ):
+            convs[row['conversation_id']]['messages'].append(self._message_from_row(row))
+        for table in ('bookmarks', 'flags'):
+            for row in conn.execute(
+                f"SELECT conversation_id, data FROM {table} WHERE conversation_id IN ({placeholders}) ORDER BY seq", ids
+            ):
+                convs[row['conversation_id']][table].append(json.loads(row['data']))
+        return [convs[info['id']] for info in infos]
+
+    def _load_rows(self, rows: List[sqlite3.Row]) -> Iterator[Dict]:
+        for start in range(0, len(rows), self.LOAD_BATCH):
+            yield from self._load_many([self._info_from_row(row) for row in rows[start:start + self.LOAD_BATCH]])
+
+    def create_conversation(self, conversation: Dict):
+        self._connection().execute(
+            "INSERT INTO conversations (id, user_id, user_role, parent_id, created_at) VALUES (?, ?, ?, ?, ?)",
+            (conversation['id'], conversation['user_id'], conversation['user_role'],
+             conversation['parent_id'], conversation['created_at'])
+        )
+
+    def get_conversation_info(self, conversation_id: str) -> Optional[Dict]:
+        row = self._connection().execute("SELECT * FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+        return self._info_from_row(row) if row else None
+
+    def get_conversation(self, conversation_id: str) -> Optional[Dict]:
+        info = self.get_conversation_info(conversation_id)
+        return self._load(info) if info else None
+
+    def get_conversations_by_parent(self, parent_id: str) -> List[Dict]:
+        rows = self._connection().execute(
+            "SELECT * FROM conversations WHERE parent_id = ? ORDER BY created_at", (parent_id,)
+        ).fetchall()
+        return list(self._load_rows(rows))
+
+    def iter_conversations(self, user_id: Optional[str] = None) -> Iterator[Dict]:
+        if user_id is None:
+            rows = self._connection().execute("SELECT * FROM conversations ORDER BY created_at").fetchall()
+        else:
+            rows = self._connection().execute(
+                "SELECT * FROM conversations WHERE user_id = ? ORDER BY created_at", (user_id,)
+            ).fetchall()
+        yield from self._load_rows(rows)
+
+    def list_conversations(
+        self,
+        parent_id: str,
+        before: Optional[str] = None,
+        limit: int = 20,
+        user_id: Optional[str] = None
+    ) -> List[Dict]:
+        query = (
+            "SELECT c.*, "
+            "(SELECT COUNT(*) FROM messages m WHERE m.conversation_id = c.id) AS message_count, "
+            "(SELECT COUNT(*) FROM flags f WHERE f.conversation_id = c.id) AS flag_count "
+            "FROM conversations c WHERE c.parent_id = ?"
+        )
+        params = [parent_id]
+        if before:
+            query += " AND c.id < ?"
+            params.append(before)
+        if user_id:
+            query += " AND c.user_id = ?"
+            params.append(user_id)
+        query += " ORDER BY c.id DESC LIMIT ?"
+        params.append(limit)
+
+        page = []
+        for row in self._connection().execute(query, params):
+            info = self._info_from_row(row)
+            info['message_count'] = row['message_count']
+            info['flag_count'] = row['flag_count']
+            page.append(info)
+        return page
+
+    def get_messages(self, conversation_id: str, before: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        query = "SELECT * FROM messages WHERE conversation_id = ?"
+        params = [conversation_id]
+        if before is not None:
+            query += " AND seq < COALESCE((SELECT MIN(seq) FROM messages WHERE conversation_id = ? AND id = ?), 1 << 62)"
+            params.extend([conversation_id, before])
+        query += " ORDER BY seq DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        rows = self._connection().execute(query, params).fetchall()
+        return [self._message_from_row(row) for row in reversed(rows)]
+
+    def add_message(self, conversation_id: str, message: Dict) -> Optional[Dict]:
+        conn = self._transaction()
+        try:
+            row = conn.execute("SELECT * FROM conversations WHERE id = ?", (conversation_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+
+            conn.execute(
+                "INSERT INTO messages (conversation_id, id, role, content, timestamp, metadata, reactions, curator_notes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (conversation_id, message['id'], message['role'], message['content'], message['timestamp'],
+                 json.dumps(message['metadata'], default=str), json.dumps(message['reactions']),
+                 json.dumps(message['curator_notes']))
+            )
+            conn.execute("COMMIT")
+            return self._info_from_row(row)
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def append_to_message(self, conversation_id: str, message_id: str, field: str, entry: Dict) -> bool:
+        if field not in ('reactions', 'curator_notes'):
+            raise ValueError(f"Unsupported message field: {field}")
+
+        conn = self._transaction()
+        try:
+            row = conn.execute(
+                f"SELECT seq, {field} FROM messages WHERE conversation_id = ? AND id = ? ORDER BY seq LIMIT 1",
+                (conversation_id, message_id)
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return False
+
+            entries = json.loads(row[field])
+            entries.append(entry)
+            conn.execute(f"UPDATE messages SET {field} = ? WHERE seq = ?", (json.dumps(entries), row['seq']))
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def add_bookmark(self, conversation_id: str, bookmark: Dict) -> bool:
+        if self.get_conversation_info(conversation_id) is None:
+            return False
+        self._connection().execute(
+            "INSERT INTO bookmarks (conversation_id, data) VALUES (?, ?)",
+            (conversation_id, json.dumps(bookmark))
+        )
+        return True
+
+    def add_flag(self, flag: Dict):
+        self._connection().execute(
+            "INSERT INTO flags (conversation_id, data) VALUES (?, ?)",
+            (flag['conversation_id'], json.dumps(flag))
+        )
+
+    def get_flagged_content(self) -> List[Dict]:
+        return [json.loads(row['data']) for row in self._connection().execute("SELECT data FROM flags ORDER BY seq")]
+
+
+def create_conversation_store() -> ConversationStore:
+    """
+    SQLite store when CONVERSATION_DB_PATH is set; in-memory with an event log in
+    CONVERSATION_LOG_DIR when that is set (CONVERSATION_LOG_SYNC, _SYNC_INTERVAL and
+    _SNAPSHOT_EVERY tune it); otherwise in-memory only
+    """
+    db_path = os.getenv('CONVERSATION_DB_PATH')
+    if db_path:
+        return SQLiteConversationStore(db_path)
+    log_dir = os.getenv('CONVERSATION_LOG_DIR')
+    if log_dir:
+        from .event_log import EventLogConversationStore
+        return EventLogConversationStore(
+            log_dir,
+            sync=os.getenv('CONVERSATION_LOG_SYNC', 'group'),
+            sync_interval=float(os.getenv('CONVERSATION_LOG_SYNC_INTERVAL', '1')),
+            snapshot_every=int(os.getenv('CONVERSATION_LOG_SNAPSHOT_EVERY', '10000'))
+        )
+    return MemoryConversationStore()
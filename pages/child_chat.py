@@ -2,7 +2,9 @@ import streamlit as st
 from datetime import datetime
 import time
 import random
-from core.constants import LEARNING_TIPS  # Import constants
+from core.constants import HISTORY_MESSAGE_LIMIT, LEARNING_TIPS  # Import constants
+from core.services import get_services
+from core.metrics import observe_stage
 
 def show(user, session_state):
     """Child chat interface with safety features using modern Streamlit chat components"""
@@ -157,6 +159,7 @@ def show(user, session_state):
     prompt = st.chat_input("What would you like to know? 🤔")
     
     if prompt:  
+        turn_started = time.perf_counter()
         
         is_safe, issues, redirect, severity = session_state.guardrails.check_message_safety(
             prompt, user['age'], user['id']
@@ -193,7 +196,8 @@ def show(user, session_state):
             metadata={
                 'blocked': not is_safe,
                 'safety_issues': issues if not is_safe else [],
-                'redirect_message': redirect if not is_safe else None
+                'redirect_message': redirect if not is_safe else None,
+                'severity': severity
             }
         )
         
@@ -216,51 +220,68 @@ def show(user, session_state):
             
             
             if severity == 'CRITICAL':
-                # In production, this would trigger immediate parent notification
+                # The parent was alerted immediately when the message was stored
                 crisis_resources = session_state.guardrails.get_crisis_resources('self-harm')
                 st.error(f"🆘 If you need help right now: {crisis_resources['message']} - {crisis_resources['hotline']}")
         
         # Get AI response regardless of safety (but with safety context)
         with st.chat_message("assistant", avatar="🤖"):
-            with st.spinner("JurneeGo is thinking... 🤔"):
-                
-                if not is_safe:
-                   
-                    safety_context = f"SAFETY ALERT: Child asked about {', '.join(issues)}. Respond with empathy, redirect to positive topics, and if self-harm is mentioned, show genuine concern and suggest talking to a trusted adult. Be helpful and caring, not just blocking."
-                    enhanced_prompt = f"{safety_context}\n\nChild's question: {prompt}"
-                else:
-                    enhanced_prompt = prompt
-                
-                response = session_state.bedrock_client.generate_response(
-                    user_input=enhanced_prompt,
-                    user_role='child',
-                    user_age=user['age'],
-                    context={
-                        'interests': user.get('interests', []),
-                        'learning_level': user.get('learning_level', 'grade_level'),
-                        'safety_concern': not is_safe,
-                        'safety_issues': issues if not is_safe else []
-                    }
-                )
-                
-                
-                safe_response = session_state.guardrails.sanitize_response(
-                    response['response']
-                )
-                
+            
+            if not is_safe:
                
-                st.markdown(safe_response)
-                
-                
-                st.session_state.messages.append({
-                    "role": "assistant", 
-                    "content": safe_response
-                })
-                
-                
-                session_state.conversation_manager.add_message(
-                    st.session_state.current_conversation_id,
-                    'assistant',
-                    safe_response,
-                    metadata=response
-                )
\ No newline at end of file
+                safety_context = f"SAFETY ALERT: Child asked about {', '.join(issues)}. Respond with empathy, redirect to positive topics, and if self-harm is mentioned, show genuine concern and suggest talking to a trusted adult. Be helpful and caring, not just blocking."
+                enhanced_prompt = f"{safety_context}\n\nChild's question: {prompt}"
+            else:
+                enhanced_prompt = prompt
+            
+            # Latest earlier turns of this conversation, excluding the question just stored
+            history = list(session_state.conversation_manager.iter_messages(
+                st.session_state.current_conversation_id, limit=HISTORY_MESSAGE_LIMIT + 1
+            ))[:-1]
+            
+            # Created on the first question rather than at app startup
+            bedrock_client = get_services().get('bedrock_client')
+            response = bedrock_client.generate_response_stream(
+                user_input=enhanced_prompt,
+                user_role='child',
+                user_age=user['age'],
+                context={
+                    'interests': user.get('interests', []),
+                    'learning_level': user.get('learning_level', 'grade_level'),
+                    'conversation_id': st.session_state.current_conversation_id,
+                    'safety_concern': not is_safe,
+                    'safety_issues': issues if not is_safe else []
+                },
+                history=history
+            )
+            
+            # Render sanitized text as it streams in; PII split across chunks is held back
+            placeholder = st.empty()
+            placeholder.markdown("JurneeGo is thinking... 🤔")
+            sanitizer = session_state.guardrails.stream_sanitizer()
+            safe_response = ""
+            
+            for chunk in response.pop('stream'):
+                safe_response += sanitizer.feed(chunk)
+                if safe_response:
+                    placeholder.markdown(safe_response + "▌")
+            
+            safe_response += sanitizer.flush()
+            placeholder.markdown(safe_response)
+            
+            
+            st.session_state.messages.append({
+                "role": "assistant", 
+                "content": safe_response
+            })
+            
+            
+            session_state.conversation_manager.add_message(
+                st.session_state.current_conversation_id,
+                'assistant',
+                safe_response,
+                metadata=response
+            )
+        
+        # Whole turn as the child experiences it, streaming and rendering included
+        observe_stage('chat_turn', time.perf_counter() - turn_started)
@@ -1,7 +1,11 @@
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
+import threading
 import time
+from core.constants import LIVE_MAX_STREAMS, LIVE_POLL_SECONDS, LIVE_STREAM_SECONDS
+
+# Page runs held open for live updates, shared by every session in the process
+_live_streams = threading.BoundedSemaphore(LIVE_MAX_STREAMS)
 
 def render_reaction_buttons(conv_id, msg_id, user_id, session_state):
     """Render reaction buttons for a message"""
@@ -24,26 +28,91 @@ def render_reaction_buttons(conv_id, msg_id, user_id, session_state):
                     )
                     st.success("Reaction added!")
 
+def render_live_message(msg):
+    """Render one message in the Live Monitoring feed"""
+    if msg['role'] == 'user':
+        if msg.get('metadata', {}).get('blocked'):
+            st.markdown(f"**🧒 Child (BLOCKED):** {msg['content']}")
+            st.warning(f"⚠️ Safety issues: {', '.join(msg['metadata']['safety_issues'])}")
+        else:
+            st.markdown(f"**🧒 Child:** {msg['content']}")
+    else:
+        st.markdown(f"**🤖 JurneeGo:** {msg['content']}")
+    
+    if msg['reactions']:
+        reactions = " ".join([r['reaction'] for r in msg['reactions']])
+        st.caption(f"Reactions: {reactions}")
+    
+    if msg['curator_notes']:
+        for note in msg['curator_notes']:
+            st.info(f"Your note: {note['note']}")
+    
+    st.divider()
+
+def live_subscription(session_state, parent_id):
+    """This browser session's subscription to the parent's change feed"""
+    subscription = st.session_state.get('live_subscription')
+    if subscription is None or subscription.closed or subscription.parent_id != parent_id:
+        subscription = session_state.conversation_manager.change_feed.subscribe(parent_id)
+        st.session_state.live_subscription = subscription
+    return subscription
+
+def stop_live_subscription():
+    subscription = st.session_state.pop('live_subscription', None)
+    if subscription is not None:
+        subscription.close()
+
+def stream_live_updates(live, subscription):
+    """
+    Keep the page run open and append only new messages and alerts as they are
+    published. The status line is redrawn after every poll; each st call is where
+    Streamlit acts on a pending rerun or stop, so widgets respond within
+    LIVE_POLL_SECONDS. Anything that can't be applied in place (a new
+    conversation, a subscriber that fell too far behind) reloads the page instead.
+    """
+    if not _live_streams.acquire(blocking=False):
+        live['status'].caption("📡 Live updates are busy right now - use Refresh to check for new messages")
+        return
+    
+    try:
+        deadline = time.monotonic() + LIVE_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            events = subscription.poll(timeout=LIVE_POLL_SECONDS)
+            live['status'].caption(f"📡 Live - last checked {datetime.now().strftime('%H:%M:%S')}")
+            if subscription.overflowed:
+                stop_live_subscription()
+                st.rerun()
+            
+            for event in events:
+                if event['child_id'] != live['child_id']:
+                    continue
+                if event['type'] == 'flag':
+                    with live['alerts']:
+                        st.error(f"🚩 New alert for Child {event['child_id']}: {event['flag']['reason']}")
+                elif event['conversation_id'] != live['conversation_id']:
+                    st.rerun()
+                elif event['message']['id'] not in live['seen']:
+                    live['seen'].add(event['message']['id'])
+                    with live['feed']:
+                        render_live_message(event['message'])
+    finally:
+        _live_streams.release()
+    
+    # Periodic full reload picks up reactions and notes added elsewhere
+    st.rerun()
+
 def show(user, session_state):
     """Parent dashboard with monitoring and curator features"""
     
     st.title("👪 Parent Dashboard - JurneeGo")
     st.markdown(f"Welcome, {user['name']}!")
     
-   
-    child_conversations = session_state.conversation_manager.get_child_conversations(user['id'])
+ 
+    # Running aggregates maintained by ConversationManager; no history scan per rerun
+    analytics = session_state.conversation_manager.get_parent_analytics(user['id'])
     
     
-    critical_alerts = []
-    for conv in child_conversations:
-        if conv.get('flags'):
-            for flag in conv['flags']:
-                if 'CRITICAL' in flag['reason']:
-                    critical_alerts.append({
-                        'time': flag['timestamp'],
-                        'message': flag.get('highlighted_text', 'N/A'),
-                        'reason': flag['reason']
-                    })
+    critical_alerts = analytics['critical_alerts']
     
     
     if critical_alerts:
@@ -76,28 +145,23 @@ def show(user, session_state):
             st.metric("Active Children", len(user.get('children', [])))
         
         with col2:
-            total_messages = sum(len(conv['messages']) for conv in child_conversations)
-            st.metric("Total Messages", total_messages)
+            st.metric("Total Messages", analytics['total_messages'])
         
         with col3:
-            today_messages = sum(
-                len([m for m in conv['messages'] 
-                     if m['timestamp'].startswith(datetime.now().strftime('%Y-%m-%d'))])
-                for conv in child_conversations
-            )
-            st.metric("Messages Today", today_messages)
+            st.metric("Messages Today", analytics['messages_today'])
         
         with col4:
-            flags = sum(len(conv.get('flags', [])) for conv in child_conversations)
-            st.metric("Flagged Content", flags, delta_color="inverse")
+            st.metric("Flagged Content", analytics['flag_count'], delta_color="inverse")
         
         
         st.subheader("Recent Activity")
         
-        if child_conversations:
-            for conv in child_conversations[-5:]:  
+        recent_conversations, _ = session_state.conversation_manager.list_conversations(user['id'], limit=5)
+        
+        if recent_conversations:
+            for conv in reversed(recent_conversations):  
                 with st.expander(f"Conversation from {conv['created_at'][:10]}"):
-                    for msg in conv['messages'][-10:]:  
+                    for msg in session_state.conversation_manager.iter_messages(conv['id'], limit=10):  
                        
                         if msg['role'] == 'user':
                             
@@ -120,11 +184,24 @@ def show(user, session_state):
        
         col1, col2 = st.columns([3, 1])
         with col1:
-            st.info("💡 Tip: This page updates automatically to show new messages")
+            live_mode = st.toggle(
+                "📡 Live updates",
+                key='live_updates',
+                help="New messages and alerts appear as they happen, without reloading the page"
+            )
         with col2:
             if st.button("🔄 Refresh Now"):
                 st.rerun()
         
+        # Subscribe before reading so nothing published in between is missed;
+        # messages already shown are skipped when their events arrive
+        subscription = live_subscription(session_state, user['id']) if live_mode else None
+        if not live_mode:
+            stop_live_subscription()
+        live = None
+        live_status = st.empty()
+        live_alerts = st.container()
+        
         
         if len(user.get('children', [])) > 1:
             selected_child = st.selectbox(
@@ -137,15 +214,34 @@ def show(user, session_state):
         
         if selected_child:
           
-            active_conv = None
-            for conv in child_conversations:
-                if conv['user_id'] == selected_child:
-                    active_conv = conv
-                    break
+            # Most recent conversation for this child
+            latest, _ = session_state.conversation_manager.list_conversations(
+                user['id'], limit=1, user_id=selected_child
+            )
+            active_conv = latest[0] if latest else None
+            live = {
+                'status': live_status,
+                'alerts': live_alerts,
+                'child_id': selected_child,
+                'conversation_id': active_conv['id'] if active_conv else None,
+                'seen': set(),
+                'feed': None
+            }
             
             if active_conv:
                 st.subheader("Current Conversation")
                 
+                # Only the latest window of messages is loaded; parents can page back
+                window_key = f"live_window_{active_conv['id']}"
+                window_size = st.session_state.get(window_key, 50)
+                live_messages = list(session_state.conversation_manager.iter_messages(
+                    active_conv['id'], limit=window_size
+                ))
+                if active_conv['message_count'] > len(live_messages):
+                    if st.button("⬆️ Show earlier messages"):
+                        st.session_state[window_key] = window_size + 50
+                        st.rerun()
+                
                 
                 col1, col2 = st.columns([2, 1])
                 
@@ -153,29 +249,12 @@ def show(user, session_state):
                     
                     chat_container = st.container()
                     with chat_container:
-                        for msg in active_conv['messages']:
-                           
-                            if msg['role'] == 'user':
-                               
-                                if msg.get('metadata', {}).get('blocked'):
-                                    st.markdown(f"**🧒 Child (BLOCKED):** {msg['content']}")
-                                    st.warning(f"⚠️ Safety issues: {', '.join(msg['metadata']['safety_issues'])}")
-                                else:
-                                    st.markdown(f"**🧒 Child:** {msg['content']}")
-                            else:
-                                st.markdown(f"**🤖 JurneeGo:** {msg['content']}")
-                            
-                           
-                            if msg['reactions']:
-                                reactions = " ".join([r['reaction'] for r in msg['reactions']])
-                                st.caption(f"Reactions: {reactions}")
-                            
-                            
-                            if msg['curator_notes']:
-                                for note in msg['curator_notes']:
-                                    st.info(f"Your note: {note['note']}")
-                            
-                            st.divider()
+                        for msg in live_messages:
+                            render_live_message(msg)
+                    
+                    # New messages from the change feed are appended here
+                    live['feed'] = st.container()
+                    live['seen'].update(msg['id'] for msg in live_messages)
                 
                 with col2:
                     st.subheader("Curator Space")
@@ -183,8 +262,8 @@ def show(user, session_state):
                     
                     message_to_annotate = st.selectbox(
                         "Select message to annotate:",
-                        range(len(active_conv['messages'])),
-                        format_func=lambda x: f"Message {x+1}: {active_conv['messages'][x]['content'][:30]}..."
+                        range(len(live_messages)),
+                        format_func=lambda x: f"Message {active_conv['message_count'] - len(live_messages) + x + 1}: {live_messages[x]['content'][:30]}..."
                     )
                     
                     curator_note = st.text_area(
@@ -194,7 +273,7 @@ def show(user, session_state):
                     
                     if st.button("Add Note"):
                         if curator_note and message_to_annotate is not None:
-                            msg_id = active_conv['messages'][message_to_annotate]['id']
+                            msg_id = live_messages[message_to_annotate]['id']
                             success = session_state.conversation_manager.add_curator_note(
                                 active_conv['id'],
                                 msg_id,
@@ -215,27 +294,18 @@ def show(user, session_state):
             st.warning("No children linked to your account.")
     
     with tab3:
+        # pandas is only needed for the charts here
+        import pandas as pd
+
         st.header("Analytics & Insights")
         
        
         st.subheader("Learning Journey")
         
-        if child_conversations:
-           
-            topics = {}
-            for conv in child_conversations:
-                for msg in conv['messages']:
-                    if msg['role'] == 'user':
-                        
-                        words = msg['content'].lower().split()
-                        for word in words:
-                            if len(word) > 4:  
-                                topics[word] = topics.get(word, 0) + 1
+        if analytics['conversation_count']:
             
-            
-            if topics:
-                top_topics = sorted(topics.items(), key=lambda x: x[1], reverse=True)[:10]
-                
+            top_topics = analytics['top_topics']
+            if top_topics:
                 st.subheader("Top Interests")
                 topic_df = pd.DataFrame(top_topics, columns=['Topic', 'Frequency'])
                 st.bar_chart(topic_df.set_index('Topic'))
@@ -243,16 +313,8 @@ def show(user, session_state):
            
             st.subheader("Engagement Timeline")
             
-           
-            timeline_data = []
-            for conv in child_conversations:
-                for msg in conv['messages']:
-                    date = msg['timestamp'][:10]
-                    timeline_data.append({'Date': date, 'Messages': 1})
-            
-            if timeline_data:
-                timeline_df = pd.DataFrame(timeline_data)
-                daily_counts = timeline_df.groupby('Date').sum()
+            if analytics['daily_counts']:
+                daily_counts = pd.DataFrame(analytics['daily_counts'], columns=['Date', 'Messages']).set_index('Date')
                 st.line_chart(daily_counts)
             
             
@@ -267,68 +329,9 @@ def show(user, session_state):
                 - **🟢 LOW**: Minor concerns - Be aware
                 """)
             
-            safety_logs = []
-            blocked_count = 0
-            flagged_count = 0
-            severity_counts = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0}
-            
-            for conv in child_conversations:
-               
-                fresh_conv = session_state.conversation_manager.get_conversation(conv['id'])
-                if fresh_conv:
-                    conv = fresh_conv
-                
-                
-                if conv.get('flags'):
-                    for flag in conv['flags']:
-                        flagged_count += 1
-                        
-                        
-                        severity = 'LOW'
-                        if 'CRITICAL' in flag['reason']:
-                            severity = 'CRITICAL'
-                        elif 'HIGH' in flag['reason']:
-                            severity = 'HIGH'
-                        elif 'MEDIUM' in flag['reason']:
-                            severity = 'MEDIUM'
-                        
-                        severity_counts[severity] += 1
-                        
-                        safety_logs.append({
-                            'Date': flag['timestamp'][:10],
-                            'Time': flag['timestamp'][11:19],
-                            'Type': flag['reason'],
-                            'Severity': severity,
-                            'Status': flag['status'],
-                            'Message': flag.get('highlighted_text', 'N/A')[:50] + '...' if flag.get('highlighted_text') else 'N/A'
-                        })
-                
-                for msg in conv.get('messages', []):
-                    if msg['role'] == 'user' and msg.get('metadata'):
-                        metadata = msg['metadata']
-                        if metadata.get('blocked') and metadata.get('safety_issues'):
-                            blocked_count += 1
-                            
-                            severity = 'HIGH'  
-                            issues_str = ', '.join(metadata['safety_issues'])
-                            
-                            if any(term in issues_str.lower() for term in ['self-harm', 'suicide', 'kill myself']):
-                                severity = 'CRITICAL'
-                            elif any(term in issues_str.lower() for term in ['drugs', 'violence', 'weapons']):
-                                severity = 'HIGH'
-                            elif any(term in issues_str.lower() for term in ['alcohol', 'inappropriate']):
-                                severity = 'MEDIUM'
-                            
-                            severity_counts[severity] += 1
-                            
-                            safety_logs.append({
-                                'Date': msg.get('timestamp', '')[:10] if msg.get('timestamp') else 'Unknown',
-                                'Time': msg.get('timestamp', '')[11:19] if msg.get('timestamp') else '',
-                                'Type': f"Blocked: {issues_str}",
-                                'Severity': severity,
-                                'Status': 'blocked',
-                                'Message': msg.get('content', '')[:50] + '...' if msg.get('content') else 'N/A'
-                            })
+            safety_logs = analytics['safety_events']
+            blocked_count = analytics['blocked_count']
+            severity_counts = analytics['severity_counts']
             
             
             col1, col2, col3, col4 = st.columns(4)
@@ -377,7 +380,7 @@ def show(user, session_state):
                     st.warning(f"📊 {blocked_count} messages were blocked for safety. This might indicate your child needs support with difficult topics.")
                     
                 
-                if len(safety_logs) > 5:
+                if analytics['safety_event_count'] > 5:
                     st.info("💡 **Pattern Detection:** Multiple safety concerns detected. Consider having an open conversation with your child about online safety.")
             else:
                 st.success("✅ No safety concerns detected! Your child is having positive interactions.")
@@ -454,4 +457,8 @@ def show(user, session_state):
                     time.sleep(1)
                     st.rerun()
                 else:
-                    st.error("Username already exists. Please choose another.")
\ No newline at end of file
+                    st.error("Username already exists. Please choose another.")
+    
+    # Runs last so the other tabs are fully rendered while the feed stays open
+    if live_mode and live is not None:
+        stream_live_updates(live, subscription)
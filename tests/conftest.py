@@ -0,0 +1,8 @@
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Tests import the app's core package and the helpers in benchmarks/ (e.g. the fake Bedrock runtime)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'benchmarks'))
+sys.path.insert(0, REPO_ROOT)
@@ -0,0 +1,95 @@
+"""COPPAGuardrails scanning: batch/single equivalence, the scan cache and streamed sanitizing"""
+import pytest
+
+from core.guardrails import COPPAGuardrails
+from guardrails_corpus import build_corpus
+
+
+def normalized(result):
+    is_safe, issues, redirect, severity = result
+    return is_safe, sorted(issues), redirect, severity
+
+
+@pytest.fixture(scope='module')
+def corpus():
+    texts = [sample['text'] for sample in build_corpus(400, 11)]
+    # Repeats, case and whitespace variants share cache keys within one batch
+    return texts + [text.upper() for text in texts[:50]] + [f"  {text} " for text in texts[:50]] + texts[:50]
+
+
+@pytest.fixture
+def guardrails():
+    return COPPAGuardrails()
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_batch_matches_single_message_checks(corpus, workers):
+    reference = COPPAGuardrails()
+    reference.scan_cache_size = 0
+    ages = [7 if index % 2 else 15 for index in range(len(corpus))]
+    expected = [normalized(reference.check_message_safety(text, age)) for text, age in zip(corpus, ages)]
+
+    results = COPPAGuardrails().check_messages_batch(corpus, ages, workers=workers, chunk_size=64)
+    actual = [
+        normalized(row) for row in
+        zip(results['is_safe'], results['issues'], results['redirect'], results['severity'])
+    ]
+    assert actual == expected
+
+
+def test_batch_scans_each_distinct_message_once(guardrails):
+    messages = ["why is the sky blue?"] * 5 + ["I want to kill myself"] * 5
+    guardrails.check_messages_batch(messages, [9] * len(messages))
+    stats = guardrails.get_scan_cache_stats()
+    assert stats['misses'] == 2
+    assert stats['hits'] == 0
+
+
+def test_batch_runs_context_analysis_in_order(guardrails):
+    messages = ["I'm thinking about it", "I'm planning to do it", "I'm going to do it"]
+    results = guardrails.check_messages_batch(messages, [12] * 3, user_ids=['child_1'] * 3)
+    assert results['is_safe'][:2] == [True, True]
+    assert "Escalating concerning behavior detected" in results['issues'][2]
+    assert results['severity'][2] == 'CRITICAL'
+
+
+def test_cached_scan_matches_uncached(corpus, guardrails):
+    uncached = COPPAGuardrails()
+    uncached.scan_cache_size = 0
+    for text in corpus + corpus:
+        assert normalized(guardrails.check_message_safety(text, 9)) == normalized(uncached.check_message_safety(text, 9))
+    assert guardrails.get_scan_cache_stats()['hits'] > 0
+
+
+def test_pii_is_scanned_on_the_raw_message(guardrails):
+    # 'İ'.lower() adds a combining dot that \w doesn't match; a cached lowered
+    # variant must not hide the address in the raw text
+    guardrails.check_message_safety("I live at 12 i̇stanbul road", 9)
+    is_safe, issues, _, _ = guardrails.check_message_safety("I live at 12 İstanbul road", 9)
+    assert not is_safe
+    assert "Personal information detected: address" in issues
+
+
+RESPONSE = ("Sure! You can email me at kid.helper@example.com or call 555-123-4567. "
+            "My SSN is 123-45-6789 and I live at 42 Maple Street in town. That's all for now.")
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 16])
+def test_streamed_pii_split_across_chunks_is_sanitized(guardrails, chunk_size):
+    sanitizer = guardrails.stream_sanitizer()
+    released = []
+    for start in range(0, len(RESPONSE), chunk_size):
+        released.append(sanitizer.feed(RESPONSE[start:start + chunk_size]))
+    released.append(sanitizer.flush())
+
+    streamed = ''.join(released)
+    assert streamed == guardrails.sanitize_response(RESPONSE)
+    for pii in ('kid.helper@example.com', '555-123-4567', '123-45-6789', '42 Maple Street'):
+        assert pii not in streamed
+
+
+def test_streamed_text_is_released_before_the_end(guardrails):
+    sanitizer = guardrails.stream_sanitizer(holdback=20)
+    released = sanitizer.feed("word " * 40)
+    assert released
+    assert released + sanitizer.flush() == "word " * 40
@@ -0,0 +1,19 @@
+"""Cold-start import budget enforced by benchmarks/import_time.py (IMPORT_BUDGET_MS overrides it)"""
+import pytest
+
+from import_time import BUDGET_MS, FORBIDDEN, measure_startup
+
+
+@pytest.fixture(scope='module')
+def startup():
+    return measure_startup()
+
+
+def test_startup_within_budget(startup):
+    startup_ms, _ = startup
+    assert startup_ms <= BUDGET_MS, f"core startup took {startup_ms:.1f} ms, over the {BUDGET_MS:.0f} ms budget"
+
+
+def test_heavy_modules_not_imported_at_startup(startup):
+    _, timings = startup
+    assert [name for name in FORBIDDEN if name in timings] == []
@@ -0,0 +1,182 @@
+"""Retry, circuit breaker and hedging behaviour of ResilientInvoker and BedrockClient"""
+import threading
+import time
+
+import pytest
+
+from core.bedrock_client import BedrockClient
+from core.resilience import CircuitBreaker, CircuitOpenError, QueueTimeoutError, ResilientInvoker, is_retryable
+from fake_bedrock import FakeBedrockRuntime, FakeClientError
+
+
+class ReadTimeoutError(Exception):
+    """Named like the botocore transport error"""
+
+
+def no_sleep(seconds):
+    pass
+
+
+def failing(error):
+    def call():
+        raise error
+    return call
+
+
+@pytest.mark.parametrize('error, retryable', [
+    (FakeClientError('ThrottlingException', 429), True),
+    (FakeClientError('ServiceUnavailableException', 503), True),
+    (FakeClientError('SomethingNew', 500), True),
+    (FakeClientError('ValidationException', 400), False),
+    (FakeClientError('AccessDeniedException', 403), False),
+    (ReadTimeoutError('read timed out'), True),
+    (ValueError('bad body'), False),
+    (QueueTimeoutError('no slot'), False),
+])
+def test_retry_classification(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_retryable_errors_are_retried_until_success():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise FakeClientError('ThrottlingException', 429)
+        return 'ok'
+
+    invoker = ResilientInvoker(max_retries=3, sleep=no_sleep)
+    assert invoker.call(flaky) == 'ok'
+    assert len(attempts) == 3
+    assert invoker.stats()['retries'] == 2
+    assert invoker.stats()['failures'] == 0
+
+
+def test_non_retryable_errors_fail_immediately():
+    invoker = ResilientInvoker(max_retries=3, sleep=no_sleep)
+    with pytest.raises(FakeClientError):
+        invoker.call(failing(FakeClientError('ValidationException', 400)))
+    assert invoker.stats()['retries'] == 0
+    assert invoker.stats()['failures'] == 1
+
+
+def test_breaker_trips_then_recovers_after_cooldown():
+    breaker = CircuitBreaker(failure_rate=0.5, window=10, min_calls=4, cooldown=0.05)
+    invoker = ResilientInvoker(max_retries=0, breaker=breaker, sleep=no_sleep)
+
+    for _ in range(4):
+        with pytest.raises(FakeClientError):
+            invoker.call(failing(FakeClientError('InternalServerException', 500)))
+    assert breaker.state == 'open'
+    assert invoker.stats()['trips'] == 1
+
+    with pytest.raises(CircuitOpenError):
+        invoker.call(lambda: 'ok')
+    assert invoker.stats()['short_circuits'] == 1
+
+    time.sleep(0.06)
+    assert invoker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_failed_half_open_trial_reopens_the_breaker():
+    breaker = CircuitBreaker(min_calls=1, cooldown=0.05)
+    invoker = ResilientInvoker(max_retries=0, breaker=breaker, sleep=no_sleep)
+    with pytest.raises(FakeClientError):
+        invoker.call(failing(FakeClientError('InternalServerException', 500)))
+    time.sleep(0.06)
+
+    with pytest.raises(FakeClientError):
+        invoker.call(failing(FakeClientError('InternalServerException', 500)))
+    assert breaker.state == 'open'
+    with pytest.raises(CircuitOpenError):
+        invoker.call(lambda: 'ok')
+
+
+def test_queue_timeouts_do_not_trip_the_breaker():
+    breaker = CircuitBreaker(min_calls=2)
+    invoker = ResilientInvoker(breaker=breaker, sleep=no_sleep)
+    for _ in range(10):
+        with pytest.raises(QueueTimeoutError):
+            invoker.call(failing(QueueTimeoutError('no slot')))
+    assert breaker.state == 'closed'
+    assert invoker.stats()['queue_timeouts'] == 10
+    assert invoker.stats()['retries'] == 0
+
+
+def test_queue_timeout_releases_the_half_open_trial():
+    breaker = CircuitBreaker(min_calls=1, cooldown=0.05)
+    invoker = ResilientInvoker(max_retries=0, breaker=breaker, sleep=no_sleep)
+    with pytest.raises(FakeClientError):
+        invoker.call(failing(FakeClientError('InternalServerException', 500)))
+    time.sleep(0.06)
+
+    with pytest.raises(QueueTimeoutError):
+        invoker.call(failing(QueueTimeoutError('no slot')))
+    assert invoker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == 'closed'
+
+
+def test_slow_call_is_hedged_and_the_faster_copy_wins():
+    calls = []
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        time.sleep(0.5 if first else 0.01)
+        return 'slow' if first else 'fast'
+
+    invoker = ResilientInvoker(hedge_after=0.05, hedge_workers=4)
+    assert invoker.call(call) == 'fast'
+    assert invoker.stats()['hedges'] == 1
+    assert invoker.stats()['hedge_wins'] == 1
+
+
+def test_fast_call_is_not_hedged():
+    invoker = ResilientInvoker(hedge_after=0.2, hedge_workers=4)
+    assert invoker.call(lambda: 'ok') == 'ok'
+    assert invoker.stats()['hedges'] == 0
+
+
+def test_hedge_timer_starts_when_the_call_runs():
+    # The only pool thread is busy, so the call waits in the queue longer than hedge_after
+    invoker = ResilientInvoker(hedge_after=0.1, hedge_workers=1)
+    invoker._executor.submit(time.sleep, 0.3)
+    assert invoker.call(lambda: time.sleep(0.02) or 'ok') == 'ok'
+    assert invoker.stats()['hedges'] == 0
+
+
+def fake_client(runtime, breaker):
+    client = BedrockClient(bedrock_runtime=runtime)
+    client.response_cache = None
+    client.resilience = ResilientInvoker(max_retries=2, breaker=breaker, sleep=no_sleep)
+    return client
+
+
+def test_client_retries_throttling_against_fake_runtime():
+    runtime = FakeBedrockRuntime(latency=0, tokens_per_sec=10000, output_tokens=5, throttle_rate=0.5, seed=3)
+    client = fake_client(runtime, CircuitBreaker())
+    for _ in range(10):
+        response = client.generate_response("why is the sky blue?", 'child', 9, {})
+        if 'error' not in response:
+            assert response['model_used'] == client.model_id
+    assert client.get_resilience_stats()['retries'] > 0
+
+
+def test_client_falls_back_while_breaker_is_open():
+    runtime = FakeBedrockRuntime(latency=0, throttle_rate=1.0)
+    client = fake_client(runtime, CircuitBreaker(min_calls=3, cooldown=60))
+    for _ in range(3):
+        assert 'error' in client.generate_response("why is the sky blue?", 'child', 9, {})
+
+    calls = runtime.counters['calls']
+    response = client.generate_response("why is the sky blue?", 'child', 9, {})
+    assert response['model_used'] == 'fallback'
+    assert runtime.counters['calls'] == calls
+
+    streamed = client.generate_response_stream("why is the sky blue?", 'child', 9, {})
+    assert ''.join(streamed['stream'])
+    assert streamed['model_used'] == 'fallback'